@@ -0,0 +1,333 @@
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from headless import build_scheduler, null_logger, run_scheduler
+import numpy as np
+
+# Events and exit reason of every case: the same on every machine
+BASELINE_PATH = "benchmarks/baseline.json"
+# Speed and memory, with the machine they were recorded on
+TIMINGS_PATH = "benchmarks/timings.json"
+
+ALGORITHMS = ["Gathering", "SEC"]
+SIZES = [10, 100, 1000, 10000]
+VISIBILITY = {"global": None, "limited": 50.0}
+
+# Larger worlds are cut off before they converge, keeping the suite tractable
+MAX_EVENTS = {10: 200000, 100: 100000, 1000: 20000, 10000: 5000}
+# Events traced to measure allocations; tracing slows the run down a lot
+ALLOCATION_EVENTS = 500
+SEED = 1234
+# Throughput of shorter runs is mostly noise and is not compared
+MIN_WALL_TIME = 0.5
+
+# Cases left out unless --all is given, too slow or too large to run often
+EXCLUDED = {
+    "gathering-10000-rigid-limited": "about 70 s and 2 GiB per run",
+    "gathering-10000-nonrigid-limited": "about 80 s and 2 GiB per run",
+    "sec-1000-rigid-global": "over 2 minutes per run",
+    "sec-1000-nonrigid-global": "about 150 s per run",
+    "sec-10000-rigid-global": "well over 10 minutes per run",
+    "sec-10000-nonrigid-global": "well over 10 minutes per run",
+    "sec-10000-rigid-limited": "about 100 s and 2 GiB per run",
+    "sec-10000-nonrigid-limited": "about 90 s and 2 GiB per run",
+}
+
+BEHAVIOUR = ("events", "exit_reason")
+# Metrics compared against the timings: name -> True if higher is better
+COMPARED_METRICS = {
+    "events_per_sec": True,
+    "peak_rss_mib": False,
+    "allocated_kib_per_event": False,
+}
+
+
+def benchmark_cases() -> dict[str, dict]:
+    """Name -> configuration of every benchmark case"""
+    cases = {}
+    for algorithm, n, rigid, (visibility, radius) in itertools.product(
+        ALGORITHMS, SIZES, [True, False], VISIBILITY.items()
+    ):
+        movement = "rigid" if rigid else "nonrigid"
+        name = f"{algorithm.lower()}-{n}-{movement}-{visibility}"
+        cases[name] = {
+            "algorithm": algorithm,
+            "num_of_robots": n,
+            "rigid_movement": rigid,
+            "visibility_radius": radius,
+            "width_bound": 100,
+            "height_bound": 100,
+            "labmda_rate": 10,
+            "threshold_precision": 5,
+        }
+
+    return cases
+
+
+def run_case(config: dict, seed: int = SEED) -> dict:
+    """
+    Runs one case to convergence (or MAX_EVENTS), then repeats its first
+    ALLOCATION_EVENTS events under tracemalloc. Meant to run in a fresh
+    process so the peak RSS belongs to this case alone.
+    """
+    max_events = MAX_EVENTS[config["num_of_robots"]]
+    scheduler = build_scheduler(config, seed=seed, logger=null_logger("benchmark"))
+    try:
+        metrics = run_scheduler(scheduler, max_events=max_events)
+    finally:
+        scheduler.close()
+
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss /= 1024**2 if sys.platform == "darwin" else 1024
+
+    return {
+        "events": metrics["events"],
+        "exit_reason": metrics["exit_reason"],
+        "converged": metrics["exit_reason"] not in ("max_events", "max_time"),
+        "simulated_time": metrics["simulated_time"],
+        "wall_time": metrics["wall_time"],
+        "events_per_sec": metrics["events_per_sec"],
+        "peak_rss_mib": peak_rss,
+        "allocated_kib_per_event": _allocated_per_event(config, seed) / 1024,
+    }
+
+
+def _allocated_per_event(config: dict, seed: int) -> float:
+    """
+    Mean number of bytes allocated on top of what is already live while
+    handling one event (the traced peak during the event)
+    """
+    scheduler = build_scheduler(config, seed=seed, logger=null_logger("benchmark"))
+    tracemalloc.start()
+    try:
+        total = events = 0
+        while events < ALLOCATION_EVENTS:
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            if scheduler.handle_event() < 0:
+                break
+            _, peak = tracemalloc.get_traced_memory()
+            total += peak - before
+            events += 1
+    finally:
+        tracemalloc.stop()
+        scheduler.close()
+
+    return total / events if events else 0.0
+
+
+def best_of(runs: list[dict]) -> dict:
+    """
+    Combines repeated runs of a case: the fastest run's timings, with the
+    lowest memory figures of all runs
+    """
+    best = dict(max(runs, key=lambda run: run["events_per_sec"]))
+    best["peak_rss_mib"] = min(run["peak_rss_mib"] for run in runs)
+    best["allocated_kib_per_event"] = min(
+        run["allocated_kib_per_event"] for run in runs
+    )
+    best["repeats"] = len(runs)
+
+    return best
+
+
+def compare(
+    results: dict, baseline: dict, timings: dict, tolerance: float
+) -> list[str]:
+    """Regressions of `results` against `baseline` and `timings`, as lines"""
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        # Same seed, same code paths: a different run means behaviour changed
+        if reference is not None and any(
+            result[key] != reference[key] for key in BEHAVIOUR
+        ):
+            regressions.append(
+                f"{name}: {result['events']} events ({result['exit_reason']}), "
+                f"baseline {reference['events']} ({reference['exit_reason']})"
+            )
+
+        reference = timings.get(name)
+        if reference is None:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            if metric == "events_per_sec" and (
+                min(result["wall_time"], reference["wall_time"]) < MIN_WALL_TIME
+            ):
+                continue
+            value, expected = result[metric], reference[metric]
+            if higher_is_better:
+                worse = value < expected * (1 - tolerance)
+            else:
+                worse = value > expected * (1 + tolerance)
+            if worse:
+                regressions.append(
+                    f"{name}: {metric} {value:.4g}, baseline {expected:.4g}"
+                )
+
+    return regressions
+
+
+def run_benchmarks(names: list[str], repeat: int = 1) -> dict[str, dict]:
+    """
+    Runs the named cases one after the other, each `repeat` times in a new
+    process, keeping the best of the repeats
+    """
+    cases = benchmark_cases()
+    results = {}
+    # One process per case: ru_maxrss never goes down within a process
+    with ProcessPoolExecutor(
+        max_workers=1,
+        mp_context=multiprocessing.get_context("spawn"),
+        max_tasks_per_child=1,
+    ) as executor:
+        for name in names:
+            runs = [
+                executor.submit(run_case, cases[name]).result() for _ in range(repeat)
+            ]
+            if any(run[key] != runs[0][key] for run in runs for key in BEHAVIOUR):
+                raise RuntimeError(f"{name} is not deterministic")
+            results[name] = best_of(runs)
+            result = results[name]
+            print(
+                f"{name:34} {result['events']:>8} events  "
+                f"{result['events_per_sec']:>10.1f} ev/s  "
+                f"{result['wall_time']:>8.2f} s  "
+                f"{result['peak_rss_mib']:>7.1f} MiB  "
+                f"{result['allocated_kib_per_event']:>8.2f} KiB/ev  "
+                f"{result['exit_reason']}",
+                flush=True,
+            )
+
+    return results
+
+
+def machine() -> dict:
+    """Describes the machine timings are recorded on"""
+    return {
+        "system": f"{platform.system()} {platform.machine()}",
+        "processor": _processor(),
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+    }
+
+
+def _processor() -> str:
+    # platform.processor() is empty on most Linux systems
+    try:
+        with open("/proc/cpuinfo") as cpuinfo:
+            for line in cpuinfo:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor()
+
+
+def _load(path: str) -> dict:
+    try:
+        with open(path) as json_file:
+            return json.load(json_file)
+    except FileNotFoundError:
+        return {}
+
+
+def _store(path: str, results: dict) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as json_file:
+        json.dump(results, json_file, indent=2)
+        json_file.write("\n")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the benchmark suite")
+    parser.add_argument(
+        "--case", action="append", help="substring of the cases to run (repeatable)"
+    )
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", choices=SIZES, help="only these sizes"
+    )
+    parser.add_argument(
+        "--all", action="store_true", help="also run the cases in EXCLUDED"
+    )
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--timings", default=TIMINGS_PATH)
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="runs per case; the best one is compared",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="relative change allowed before a metric counts as a regression",
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="store these results in the baseline and timings instead of comparing",
+    )
+    parser.add_argument("--output", default=None, help="write the results here")
+    args = parser.parse_args(argv)
+
+    names = [
+        name
+        for name, config in benchmark_cases().items()
+        if (args.case is None or any(case in name for case in args.case))
+        and (args.sizes is None or config["num_of_robots"] in args.sizes)
+        and (args.all or name not in EXCLUDED)
+    ]
+    results = run_benchmarks(names, args.repeat)
+
+    if args.output is not None:
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent=2)
+
+    baseline = _load(args.baseline)
+    recorded = _load(args.timings)
+    timings = recorded.get("cases", {})
+
+    if args.update_baseline:
+        if recorded and recorded["machine"] != machine():
+            # Timings of different machines cannot be compared with each other
+            timings = {}
+        for name, result in results.items():
+            baseline[name] = {key: result[key] for key in BEHAVIOUR}
+            timings[name] = result
+        _store(args.baseline, dict(sorted(baseline.items())))
+        _store(
+            args.timings, {"machine": machine(), "cases": dict(sorted(timings.items()))}
+        )
+        return 0
+
+    missing = [name for name in results if name not in baseline]
+    if missing:
+        print(f"No baseline for {len(missing)} case(s): {', '.join(missing)}")
+    if not timings:
+        print(f"No timings in {args.timings}: only events are compared")
+    elif recorded["machine"] != machine():
+        print(
+            f"Timings were recorded on another machine ({recorded['machine']}); "
+            "record your own with --update-baseline for a meaningful comparison"
+        )
+
+    regressions = compare(results, baseline, timings, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
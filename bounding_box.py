@@ -0,0 +1,60 @@
+from type_defs import *
+import heapq
+
+
+class BoundingBox:
+    """
+    Bounding box of one rectangle per robot, kept in four lazy heaps. An
+    update pushes the robot's new extent and bumps its version; outdated
+    entries are only dropped when they reach the top, so updates and
+    queries are O(log n) amortized.
+    """
+
+    def __init__(self, n: int):
+        self._versions = [0] * n
+        self._members = 0
+        self._present = [False] * n
+        # min x, min y, -max x, -max y
+        self._heaps: list[list[tuple[float, int, int]]] = [[], [], [], []]
+
+    def __len__(self) -> int:
+        return self._members
+
+    def update(
+        self, id: Id, extent: tuple[float, float, float, float] | None
+    ) -> None:
+        """Sets the robot's extent (min x, min y, max x, max y), or removes it"""
+        self._versions[id] += 1
+        self._members += (extent is not None) - self._present[id]
+        self._present[id] = extent is not None
+        if extent is None:
+            return
+
+        version = self._versions[id]
+        min_x, min_y, max_x, max_y = extent
+        for heap, value in zip(self._heaps, (min_x, min_y, -max_x, -max_y)):
+            heapq.heappush(heap, (float(value), id, version))
+
+        # Rebuild now and then so the heaps stay O(n)
+        if len(self._heaps[0]) > 4 * len(self._versions) + 64:
+            self._compact()
+
+    def bounds(self) -> tuple[float, float, float, float] | None:
+        """(min x, min y, max x, max y), or None when empty"""
+        if self._members == 0:
+            return None
+
+        min_x, min_y, max_x, max_y = (self._top(heap) for heap in self._heaps)
+        return (min_x, min_y, -max_x, -max_y)
+
+    def _top(self, heap: list[tuple[float, int, int]]) -> float:
+        while heap[0][2] != self._versions[heap[0][1]]:
+            heapq.heappop(heap)
+
+        return heap[0][0]
+
+    def _compact(self) -> None:
+        for i, heap in enumerate(self._heaps):
+            heap = [entry for entry in heap if entry[2] == self._versions[entry[1]]]
+            heapq.heapify(heap)
+            self._heaps[i] = heap
@@ -0,0 +1,111 @@
+from type_defs import *
+from world_state import WorldState, MOVE_CODE
+from bounding_box import BoundingBox
+import math
+import numpy as np
+
+
+class CentroidTracker:
+    """
+    Running centroid and bounding box of every robot, for Gathering with
+    unlimited visibility. Robots at rest add their position to the sums; a
+    moving robot adds `start - start_time * velocity` and `velocity`, so the
+    centroid at any time t is (constants + t * velocities) / n.
+
+    Sums are updated from the Scheduler on every robot event and recomputed
+    from the world state every n updates so rounding errors cannot pile up.
+    """
+
+    def __init__(self, world: WorldState):
+        n = len(world)
+        self.world = world
+        # Constant x, y and velocity x, y of each robot
+        self._terms = [(0.0, 0.0, 0.0, 0.0)] * n
+        self._sums = [0.0, 0.0, 0.0, 0.0]
+        self._updates = 0
+        # Points of the robots at rest, paths of the moving ones
+        self.resting = BoundingBox(n)
+        self.paths = BoundingBox(n)
+        for id in range(n):
+            self.update(id)
+        self.refresh()
+
+    def update(self, id: Id) -> None:
+        """Refreshes one robot from the world state"""
+        world = self.world
+        if world.states[id] == MOVE_CODE:
+            start_x, start_y = world.start_positions[id].tolist()
+            target_x, target_y = world.targets[id].tolist()
+            start_time = float(world.start_times[id])
+            distance = math.hypot(target_x - start_x, target_y - start_y)
+            scale = world.speeds[id] / distance if distance > 0 else 0.0
+            vx, vy = scale * (target_x - start_x), scale * (target_y - start_y)
+            terms = (start_x - start_time * vx, start_y - start_time * vy, vx, vy)
+            self.resting.update(id, None)
+            self.paths.update(
+                id,
+                (
+                    min(start_x, target_x),
+                    min(start_y, target_y),
+                    max(start_x, target_x),
+                    max(start_y, target_y),
+                ),
+            )
+        else:
+            x, y = world.positions[id].tolist()
+            terms = (x, y, 0.0, 0.0)
+            self.resting.update(id, (x, y, x, y))
+            self.paths.update(id, None)
+
+        old = self._terms[id]
+        self._terms[id] = terms
+        self._sums = [s + new - prev for s, new, prev in zip(self._sums, terms, old)]
+
+        self._updates += 1
+        if self._updates >= len(self._terms):
+            self.refresh()
+
+    def refresh(self) -> None:
+        """Recomputes the sums from the per-robot terms"""
+        self._sums = np.array(self._terms, dtype=np.float64).sum(axis=0).tolist()
+        self._updates = 0
+
+    def get_state(self) -> dict:
+        # The running sums carry rounding that refresh() would not reproduce
+        return {"sums": list(self._sums), "updates": self._updates}
+
+    def set_state(self, state: dict) -> None:
+        self._sums = list(state["sums"])
+        self._updates = state["updates"]
+
+    def centroid(self, time: Time) -> Coordinates:
+        n = len(self._terms)
+        x, y, vx, vy = self._sums
+        return Coordinates((x + time * vx) / n, (y + time * vy) / n)
+
+    def within(self, coord: Coordinates, tolerance: float) -> bool | None:
+        """
+        Whether every robot is within `tolerance` of `coord`: True or False
+        when the bounding boxes decide it, None when every robot has to be
+        checked
+        """
+        resting, paths = self.resting.bounds(), self.paths.bounds()
+        boxes = [box for box in (resting, paths) if box is not None]
+        min_x = min(box[0] for box in boxes)
+        min_y = min(box[1] for box in boxes)
+        max_x = max(box[2] for box in boxes)
+        max_y = max(box[3] for box in boxes)
+        farthest = math.hypot(
+            max(coord.x - min_x, max_x - coord.x), max(coord.y - min_y, max_y - coord.y)
+        )
+        if farthest <= tolerance:
+            return True
+
+        # The extremes of the resting box are actual robot positions
+        if resting is not None and (
+            max(coord.x - resting[0], resting[2] - coord.x) > tolerance
+            or max(coord.y - resting[1], resting[3] - coord.y) > tolerance
+        ):
+            return False
+
+        return None
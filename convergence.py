@@ -0,0 +1,200 @@
+from enums import Algorithm
+from type_defs import *
+from world_state import WorldState, MOVE_CODE
+from bounding_box import BoundingBox
+from sec import smallest_enclosing_circle, circle_support, on_circle
+import math
+import numpy as np
+
+
+class ConvergenceDetector:
+    """
+    Decides whether a run can stop early. Counts and the bounding box cost
+    O(log n) amortized per event. For SEC, every event that invalidates the
+    circle costs an O(n) expected solve at the next check, so the worst
+    case, a boundary robot moving at every event, is O(n) per event.
+
+    A robot is settled when its latest LOOK, taken after the last movement
+    in the world ended, left it frozen. Once every robot is settled or
+    terminated nothing can move anymore, whatever the algorithm: "settled".
+
+    For Gathering the bounding box of all robots (the whole path for moving
+    ones) is kept in a BoundingBox; once half its diagonal is within the
+    threshold every robot is within the threshold of one point: "gathered".
+
+    For SEC the smallest enclosing circle of all robots is kept with the
+    robots on its boundary. A robot coming to rest only invalidates it when
+    it was on the boundary or lands outside, and otherwise only updates the
+    count of robots on the circle, so it is solved again only when the
+    circle actually changed. Once no robot is moving and every robot is on
+    the circle: "formed".
+
+    Runs where every robot terminated end on their own and get no reason.
+    """
+
+    def __init__(
+        self, world: WorldState, algorithm: Algorithm, threshold_precision: int
+    ):
+        n = len(world)
+        self.world = world
+        self.algorithm = algorithm
+        self.threshold_precision = threshold_precision
+        self.threshold = 10**-threshold_precision
+
+        # A movement ending starts a new epoch, unsettling every robot
+        self.epoch = 0
+        self.settled_epochs = [-1] * n
+        self.settled = 0
+
+        self.frozen = 0
+        self.terminated = 0
+        self.moving = 0
+        self._frozen = [False] * n
+        self._terminated = [False] * n
+        self._moving = [False] * n
+
+        # SEC of every robot and its boundary, solved lazily by sec_radius
+        self.sec: Circle | None = None
+        self.sec_support: dict[Id, tuple[float, float]] = {}
+        self.on_sec = 0
+        self._on_sec = [False] * n
+
+        self.box = BoundingBox(n)
+        for id in range(n):
+            self.update(id)
+
+    def update(self, id: Id) -> None:
+        """Refreshes the counts and extent of one robot from the world state"""
+        world = self.world
+        frozen, terminated = bool(world.frozen[id]), bool(world.terminated[id])
+        self.frozen += frozen - self._frozen[id]
+        self.terminated += terminated - self._terminated[id]
+        self._frozen[id], self._terminated[id] = frozen, terminated
+        moving = bool(world.states[id] == MOVE_CODE)
+        self.moving += moving - self._moving[id]
+        self._moving[id] = moving
+
+        self.box.update(id, extent(world, id))
+        if self.algorithm == Algorithm.SEC and self.sec is not None:
+            self._update_sec(id, moving)
+
+    def _update_sec(self, id: Id, moving: bool) -> None:
+        if moving:
+            # Checked again once it comes to rest
+            if id in self.sec_support:
+                self.sec = None
+            self._set_on_sec(id, False)
+            return
+
+        x, y = self.world.positions[id].tolist()
+        if id in self.sec_support and self.sec_support[id] != (x, y):
+            self.sec = None
+            return
+
+        distance = math.hypot(x - self.sec.center[0], y - self.sec.center[1])
+        if distance > self.sec.radius + self.threshold:
+            self.sec = None
+            return
+        self._set_on_sec(id, abs(distance - self.sec.radius) < self.threshold)
+
+    def _set_on_sec(self, id: Id, on: bool) -> None:
+        self.on_sec += on - self._on_sec[id]
+        self._on_sec[id] = on
+
+    def looked(self, id: Id) -> None:
+        """Records the outcome of a LOOK, after `update`"""
+        # Terminated robots are counted apart, they never LOOK again
+        settled = self._frozen[id] and not self._terminated[id]
+        was_settled = self.settled_epochs[id] == self.epoch
+        if settled and not was_settled:
+            self.settled_epochs[id] = self.epoch
+            self.settled += 1
+        elif was_settled and not settled:
+            self.settled_epochs[id] = -1
+            self.settled -= 1
+
+    def moved(self) -> None:
+        """Records the end of a movement"""
+        self.epoch += 1
+        self.settled = 0
+
+    def diameter(self) -> float:
+        """Diagonal of the bounding box of every robot"""
+        min_x, min_y, max_x, max_y = self.box.bounds()
+        return math.hypot(max_x - min_x, max_y - min_y)
+
+    def sec_radius(self) -> float:
+        """Radius of the smallest circle enclosing every robot at rest"""
+        if self.sec is None:
+            n = len(self._on_sec)
+            positions = self.world.positions
+            threshold_precision = self.threshold_precision
+            # Fresh generator: the circle only depends on the positions
+            self.sec = smallest_enclosing_circle(
+                positions, threshold_precision, np.random.default_rng(0)
+            )
+            self.sec_support = circle_support(
+                self.sec, np.arange(n), positions, threshold_precision
+            )
+            on = np.zeros(n, dtype=bool)
+            on[on_circle(self.sec, positions, threshold_precision)] = True
+            self._on_sec = on.tolist()
+            self.on_sec = int(on.sum())
+
+        return self.sec.radius
+
+    def check(self) -> str | None:
+        """Reason the run can stop, or None"""
+        n = len(self.settled_epochs)
+        if self.terminated == n:
+            return None
+        if self.settled + self.terminated == n:
+            return "settled"
+        if (
+            self.algorithm == Algorithm.GATHERING
+            and self.diameter() / 2 <= self.threshold
+        ):
+            return "gathered"
+        if self.algorithm == Algorithm.SEC and self.moving == 0:
+            self.sec_radius()
+            if self.on_sec == n:
+                return "formed"
+
+        return None
+
+    def get_state(self) -> dict:
+        return {
+            "epoch": self.epoch,
+            "settled_epochs": list(self.settled_epochs),
+            "sec": self.sec,
+            "sec_support": dict(self.sec_support),
+            "on_sec": list(self._on_sec),
+        }
+
+    def set_state(self, state: dict) -> None:
+        self.epoch = state["epoch"]
+        self.settled_epochs = list(state["settled_epochs"])
+        self.settled = sum(
+            epoch == self.epoch and not terminated
+            for epoch, terminated in zip(self.settled_epochs, self._terminated)
+        )
+        self.sec = state["sec"]
+        self.sec_support = dict(state["sec_support"])
+        self._on_sec = list(state["on_sec"])
+        self.on_sec = sum(self._on_sec)
+
+
+def extent(world: WorldState, id: Id) -> tuple[float, float, float, float]:
+    """Box around a robot's position, or around its whole path while moving"""
+    if world.states[id] == MOVE_CODE:
+        start_x, start_y = world.start_positions[id].tolist()
+        target_x, target_y = world.targets[id].tolist()
+        return (
+            min(start_x, target_x),
+            min(start_y, target_y),
+            max(start_x, target_x),
+            max(start_y, target_y),
+        )
+
+    x, y = world.positions[id].tolist()
+    return (x, y, x, y)
@@ -18,6 +18,17 @@ class RobotState(str, Enum):
 
 class SchedulerType(Enum):
     ASYNC = "Async"
+    FSYNC = "FSync"
+    SSYNC = "SSync"
+
+    @classmethod
+    def _missing_(cls, value):
+        # Configuration files spell it in any case ("async")
+        if isinstance(value, str):
+            for member in cls:
+                if member.value.lower() == value.lower():
+                    return member
+        return None
 
 
 class DistributionType(Enum):
@@ -27,5 +38,20 @@ class DistributionType(Enum):
 class Algorithm(Enum):
     GATHERING = "Gathering"
     SEC = "SEC"
-import os
-print("Current Working Directory:", os.getcwd())
+
+
+class RandomMode(Enum):
+    BUFFERED = "Buffered"
+    COMPAT = "Compat"
+
+
+class HistoryPolicy(Enum):
+    NONE = "None"
+    RING = "Ring"
+    SPILL = "Spill"
+
+
+class FrameDropPolicy(Enum):
+    DROP_OLDEST = "Drop Oldest"
+    DROP_NEWEST = "Drop Newest"
+    BLOCK = "Block"
@@ -0,0 +1,140 @@
+from logging.handlers import QueueHandler, QueueListener
+import json
+import logging
+import queue
+
+# Verbosity -> logger level. Robot events are logged at INFO, LOOK snapshots
+# (O(n) to format) at DEBUG.
+VERBOSITY_LEVELS = {
+    0: logging.WARNING,
+    1: logging.INFO,
+    2: logging.DEBUG,
+}
+
+_listeners: dict[str, QueueListener] = {}
+
+
+def log_event(
+    logger: logging.Logger,
+    level: int,
+    time: float | None,
+    robot_id: int | None,
+    event: str,
+    message: str,
+    *args,
+) -> None:
+    """
+    Logs one simulation event. Nothing is formatted, and no record is built,
+    unless the logger is enabled for `level`; arguments are only
+    interpolated into `message` by the handler that writes the record, on
+    the background thread. Pass immutable values, or values that are never
+    modified after the call, since they are read at that later point.
+    """
+    if not logger.isEnabledFor(level):
+        return
+
+    if robot_id is not None:
+        message = "[%s] {R%s} " + message
+        args = (time, robot_id, *args)
+    elif time is not None:
+        message = "[%s] " + message
+        args = (time, *args)
+
+    logger.log(
+        level,
+        message,
+        *args,
+        extra={"sim_time": time, "robot_id": robot_id, "event": event},
+    )
+
+
+class EventFormatter(logging.Formatter):
+    """Plain message lines, or one JSON object per line when `structured`"""
+
+    def __init__(self, structured: bool = False):
+        super().__init__("")
+        self.structured = structured
+
+    def format(self, record: logging.LogRecord) -> str:
+        if not self.structured:
+            return record.getMessage()
+
+        return json.dumps(
+            {
+                "time": getattr(record, "sim_time", None),
+                "robot": getattr(record, "robot_id", None),
+                "event": getattr(record, "event", None),
+                "level": record.levelname,
+                "message": record.getMessage(),
+            },
+            default=str,
+        )
+
+
+class _DeferredQueueHandler(QueueHandler):
+    # QueueHandler.prepare formats the record in the calling thread; keep it
+    # as is so formatting happens on the writer thread instead. Arguments are
+    # then read from that thread, so only log immutable values.
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup_event_logger(
+    name: str,
+    path: str | None = None,
+    verbosity: int = 1,
+    structured: bool = False,
+    background: bool = True,
+) -> logging.Logger:
+    """
+    Returns a logger for a single simulation. With `background`, records are
+    put on a queue and formatted and written to `path` by a separate thread.
+    Without a path, or with verbosity 0, nothing is written.
+    """
+    logger = logging.getLogger(name)
+    _close_handlers(logger)
+    logger.propagate = False
+    logger.setLevel(VERBOSITY_LEVELS[verbosity])
+
+    if path is None or verbosity == 0:
+        logger.addHandler(logging.NullHandler())
+        return logger
+
+    file_handler = logging.FileHandler(path)
+    file_handler.setFormatter(EventFormatter(structured))
+
+    if not background:
+        logger.addHandler(file_handler)
+        return logger
+
+    records = queue.SimpleQueue()
+    listener = QueueListener(records, file_handler)
+    listener.start()
+    _listeners[name] = listener
+    logger.addHandler(_DeferredQueueHandler(records))
+
+    return logger
+
+
+def close_event_logger(logger: logging.Logger) -> None:
+    """
+    Writes out queued records, closes the logger's handlers and removes the
+    logger from the logging registry, so loggers of finished simulations
+    do not pile up
+    """
+    _close_handlers(logger)
+    manager = logging.Logger.manager
+    if manager.loggerDict.get(logger.name) is logger:
+        del manager.loggerDict[logger.name]
+
+
+def _close_handlers(logger: logging.Logger) -> None:
+    listener = _listeners.pop(logger.name, None)
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+    for handler in logger.handlers[:]:
+        handler.close()
+        logger.removeHandler(handler)
@@ -0,0 +1,138 @@
+from type_defs import *
+import heapq
+import itertools
+
+# Marks a heap entry whose event was cancelled or rescheduled; it is dropped
+# when it reaches the top of the heap
+_REMOVED = None
+
+
+class EventQueue:
+    """
+    Pending events in two lanes: robot events, at most one per robot, and
+    observer samples, at most one per observer. Each lane is a heap with
+    an index from robot id / observer name to its entry, so an event can be
+    looked up, cancelled or rescheduled in O(1) (plus O(log n) to push the
+    replacement).
+
+    Robot events are ordered by (time, robot id), observer samples by
+    (time, order of scheduling). Observers go first on equal times.
+    """
+
+    def __init__(self, events: list[Event] = ()):
+        self._robot_heap: list[list] = []
+        self._robot_entries: dict[Id, list] = {}
+        self._observer_heap: list[list] = []
+        self._observer_entries: dict[str, list] = {}
+        self._counter = itertools.count()
+
+        for event in events:
+            entry = [event.time, event.id, next(self._counter), event]
+            self._robot_heap.append(entry)
+            self._robot_entries[event.id] = entry
+        heapq.heapify(self._robot_heap)
+
+    def __len__(self) -> int:
+        """Number of pending robot events"""
+        return len(self._robot_entries)
+
+    def __bool__(self) -> bool:
+        return bool(self._robot_entries)
+
+    def push(self, event: Event) -> None:
+        """Schedules `event`, replacing the robot's pending event if it has one"""
+        self.cancel(event.id)
+        entry = [event.time, event.id, next(self._counter), event]
+        self._robot_entries[event.id] = entry
+        heapq.heappush(self._robot_heap, entry)
+
+    def pending(self, id: Id) -> Event | None:
+        entry = self._robot_entries.get(id)
+        return entry[3] if entry is not None else None
+
+    def cancel(self, id: Id) -> Event | None:
+        """Removes and returns the robot's pending event"""
+        entry = self._robot_entries.pop(id, None)
+        if entry is None:
+            return None
+
+        event = entry[3]
+        entry[3] = _REMOVED
+        return event
+
+    def clear(self) -> None:
+        """Cancels every pending robot event"""
+        self._robot_heap = []
+        self._robot_entries = {}
+
+    def reschedule(self, id: Id, time: Time) -> Event:
+        """Moves the robot's pending event to `time`"""
+        event = self.cancel(id)
+        if event is None:
+            raise KeyError(f"Robot {id} has no pending event")
+
+        event = event._replace(time=time)
+        self.push(event)
+        return event
+
+    def peek(self) -> Event | None:
+        """Next robot event, without removing it"""
+        heap = self._robot_heap
+        while heap and heap[0][3] is _REMOVED:
+            heapq.heappop(heap)
+
+        return heap[0][3] if heap else None
+
+    def pop(self) -> Event:
+        """Removes and returns the next robot event"""
+        heap = self._robot_heap
+        while heap:
+            entry = heapq.heappop(heap)
+            event = entry[3]
+            if event is not _REMOVED:
+                del self._robot_entries[event.id]
+                return event
+
+        raise IndexError("pop from an empty event queue")
+
+    def events(self) -> list[Event]:
+        """Pending robot events, in the order they will be processed"""
+        return [
+            entry[3]
+            for entry in sorted(self._robot_entries.values(), key=lambda e: e[:3])
+        ]
+
+    def push_observer(self, name: str, time: Time) -> None:
+        """Schedules the observer's next sample, replacing any pending one"""
+        self.cancel_observer(name)
+        entry = [time, next(self._counter), name]
+        self._observer_entries[name] = entry
+        heapq.heappush(self._observer_heap, entry)
+
+    def cancel_observer(self, name: str) -> Time | None:
+        entry = self._observer_entries.pop(name, None)
+        if entry is None:
+            return None
+
+        entry[2] = _REMOVED
+        return entry[0]
+
+    def peek_observer(self) -> tuple[Time, str] | None:
+        """Time and name of the next observer sample"""
+        heap = self._observer_heap
+        while heap and heap[0][2] is _REMOVED:
+            heapq.heappop(heap)
+
+        return (heap[0][0], heap[0][2]) if heap else None
+
+    def next_is_observer(self) -> bool:
+        """Whether the next item to process is an observer sample"""
+        observer = self.peek_observer()
+        if observer is None:
+            return False
+
+        event = self.peek()
+        return event is None or observer[0] <= event.time
+
+    def observer_times(self) -> dict[str, Time]:
+        return {name: entry[0] for name, entry in self._observer_entries.items()}
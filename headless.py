@@ -0,0 +1,314 @@
+import argparse
+import json
+import logging
+import time
+import numpy as np
+from enums import Algorithm, HistoryPolicy, RandomMode, SchedulerType
+from scheduler import Scheduler
+from synchronous import SyncScheduler
+from event_log import setup_event_logger, close_event_logger
+
+
+def load_config(path: str) -> dict:
+    with open(path) as config_file:
+        return json.load(config_file)
+
+
+def generate_initial_positions(generator, width_bound, height_bound, n, compat=False):
+    # Earlier runs drew x up to height_bound; Compat keeps that to reproduce them
+    x_high = height_bound if compat else width_bound
+    x_positions = generator.uniform(low=-width_bound, high=x_high, size=(n,))
+    y_positions = generator.uniform(low=-height_bound, high=height_bound, size=(n,))
+
+    positions = np.column_stack((x_positions, y_positions))
+
+    return positions
+
+
+def null_logger(name: str = "headless") -> logging.Logger:
+    """Returns a logger that discards everything written to it"""
+    return setup_event_logger(name, verbosity=0)
+
+
+def build_scheduler(
+    config: dict,
+    seed: int | None = None,
+    logger: logging.Logger | None = None,
+    visualization: bool = False,
+) -> Scheduler | SyncScheduler:
+    """
+    Builds a Scheduler, or a SyncScheduler for the FSYNC and SSYNC models,
+    from a configuration dictionary. Accepts both the keys of `config.json`
+    and the ones sent by the browser client.
+    """
+    if seed is None:
+        seed = config.get("random_seed")
+    if seed is None:
+        seed = int(np.random.default_rng().integers(1, 2**32 - 1))
+
+    if logger is None:
+        logger = null_logger()
+
+    num_robots = config.get("num_of_robots", config.get("number_of_robots"))
+    initial_positions = config.get("initial_positions")
+
+    if initial_positions is not None and len(initial_positions) != 0:
+        # User defined
+        num_robots = len(initial_positions)
+    else:
+        # Random
+        generator = np.random.default_rng(seed=seed)
+        initial_positions = generate_initial_positions(
+            generator,
+            config.get("width_bound", 100),
+            config.get("height_bound", 100),
+            num_robots,
+            compat=RandomMode(config.get("random_mode", RandomMode.BUFFERED))
+            == RandomMode.COMPAT,
+        )
+
+    scheduler_type = SchedulerType(config.get("scheduler_type", SchedulerType.ASYNC))
+    if scheduler_type != SchedulerType.ASYNC:
+        return SyncScheduler(
+            logger=logger,
+            seed=seed,
+            num_of_robots=num_robots,
+            initial_positions=initial_positions,
+            algorithm=config.get("algorithm", Algorithm.GATHERING.value),
+            scheduler_type=scheduler_type,
+            visibility_radius=config.get("visibility_radius"),
+            rigid_movement=config.get("rigid_movement", True),
+            threshold_precision=config.get("threshold_precision", 5),
+            activation_probability=config.get("activation_probability", 0.5),
+            visualization=visualization,
+        )
+
+    scheduler = Scheduler(
+        logger=logger,
+        seed=seed,
+        num_of_robots=num_robots,
+        initial_positions=initial_positions,
+        robot_speeds=config.get("robot_speeds", 1.0),
+        algorithm=config.get("algorithm", Algorithm.GATHERING.value),
+        visibility_radius=config.get("visibility_radius"),
+        rigid_movement=config.get("rigid_movement", True),
+        multiplicity_detection=config.get("multiplicity_detection", False),
+        threshold_precision=config.get("threshold_precision", 5),
+        sampling_rate=config.get("sampling_rate", 0.2),
+        labmda_rate=config.get("labmda_rate", 5),
+        random_mode=config.get("random_mode", RandomMode.BUFFERED),
+        legacy_algorithms=config.get("legacy_algorithms", False),
+        stop_on_convergence=config.get("stop_on_convergence", True),
+        visualization=visualization,
+        history_policy=config.get("history_policy", HistoryPolicy.NONE),
+        history_size=config.get("history_size", 100),
+        history_path=config.get("history_path"),
+        trace_path=config.get("trace_path"),
+        checkpoint_path=config.get("checkpoint_path"),
+        checkpoint_interval=config.get("checkpoint_interval", 100000),
+    )
+    if config.get("profile", False):
+        scheduler.enable_profiling(config.get("profile_allocations", False))
+
+    return scheduler
+
+
+def run_scheduler(
+    scheduler: Scheduler | SyncScheduler,
+    max_events: int | None = None,
+    max_time: float | None = None,
+) -> dict:
+    """
+    Runs a Scheduler until its queue is empty or a limit is hit. For a
+    SyncScheduler every round counts as one event.
+    """
+    # exit code -> number of events
+    event_counts = {0: 0, 1: 0, 2: 0, 3: 0, 4: 0}
+    events = 0
+    exit_reason = "completed"
+
+    start = time.perf_counter()
+    while True:
+        if max_events is not None and events >= max_events:
+            exit_reason = "max_events"
+            break
+        if max_time is not None and scheduler.current_time >= max_time:
+            exit_reason = "max_time"
+            break
+
+        exit_code = scheduler.handle_event()
+        if exit_code < 0:
+            if scheduler.exit_reason is not None:
+                exit_reason = scheduler.exit_reason
+            break
+
+        events += 1
+        event_counts[exit_code] += 1
+    wall_time = time.perf_counter() - start
+    summary = scheduler.summary()
+
+    metrics = {
+        "seed": scheduler.seed,
+        "num_of_robots": summary["num_of_robots"],
+        "algorithm": summary["algorithm"],
+        "exit_reason": exit_reason,
+        "events": events,
+        "look_events": event_counts[1] + event_counts[4],
+        "move_events": event_counts[2],
+        "wait_events": event_counts[3],
+        "simulated_time": scheduler.current_time,
+        "wall_time": wall_time,
+        "events_per_sec": events / wall_time if wall_time > 0 else 0.0,
+        "terminated_robots": summary["terminated_robots"],
+        "frozen_robots": summary["frozen_robots"],
+        "total_distance": summary["total_distance"],
+    }
+    # Only the asynchronous Scheduler can be profiled
+    profiler = getattr(scheduler, "profiler", None)
+    if profiler is not None:
+        metrics["profile"] = profiler.report()
+
+    return metrics
+
+
+def run_headless(
+    config: dict,
+    seed: int | None = None,
+    max_events: int | None = None,
+    max_time: float | None = None,
+    logger: logging.Logger | None = None,
+) -> dict:
+    """
+    Runs a simulation to termination without the server and returns summary
+    metrics. No visualization events are generated.
+    """
+    scheduler = build_scheduler(config, seed=seed, logger=logger)
+    try:
+        return run_scheduler(scheduler, max_events=max_events, max_time=max_time)
+    finally:
+        scheduler.close()
+
+
+def resume_headless(
+    checkpoint_path: str,
+    max_events: int | None = None,
+    max_time: float | None = None,
+    logger: logging.Logger | None = None,
+    profile: bool = False,
+    profile_allocations: bool = False,
+    **overrides,
+) -> dict:
+    """
+    Continues a run from a checkpoint written by Scheduler.write_checkpoint.
+    `overrides` replace constructor arguments stored in the checkpoint.
+    """
+    scheduler = Scheduler.from_checkpoint(
+        checkpoint_path, logger if logger is not None else null_logger(), **overrides
+    )
+    if profile:
+        scheduler.enable_profiling(profile_allocations)
+    try:
+        return run_scheduler(scheduler, max_events=max_events, max_time=max_time)
+    finally:
+        scheduler.close()
+
+
+def main(argv: list[str] | None = None) -> dict:
+    parser = argparse.ArgumentParser(description="Run a simulation without the UI")
+    parser.add_argument("--config", default="config.json", help="configuration file")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--algorithm", choices=[a.value for a in Algorithm])
+    parser.add_argument("--scheduler", choices=[t.value for t in SchedulerType])
+    parser.add_argument("--max-events", type=int, default=None)
+    parser.add_argument("--max-time", type=float, default=None)
+    parser.add_argument("--log", default=None, help="write the simulation log here")
+    parser.add_argument(
+        "--verbosity",
+        type=int,
+        choices=[0, 1, 2],
+        default=1,
+        help="0: nothing, 1: one line per event, 2: also every LOOK snapshot",
+    )
+    parser.add_argument(
+        "--structured-log", action="store_true", help="log one JSON object per line"
+    )
+    parser.add_argument(
+        "--profile", action="store_true", help="report the time spent per phase"
+    )
+    parser.add_argument(
+        "--profile-allocations",
+        action="store_true",
+        help="also trace the memory allocated per event (slow)",
+    )
+    parser.add_argument("--trace", default=None, help="record a binary trace here")
+    parser.add_argument("--checkpoint", default=None, help="checkpoint file")
+    parser.add_argument("--checkpoint-interval", type=int, default=None)
+    parser.add_argument(
+        "--resume", action="store_true", help="continue from --checkpoint"
+    )
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config)
+    if args.algorithm is not None:
+        config["algorithm"] = args.algorithm
+    if args.scheduler is not None:
+        config["scheduler_type"] = args.scheduler
+    if args.trace is not None:
+        config["trace_path"] = args.trace
+    if args.checkpoint is not None:
+        config["checkpoint_path"] = args.checkpoint
+    if args.checkpoint_interval is not None:
+        config["checkpoint_interval"] = args.checkpoint_interval
+    if args.profile or args.profile_allocations:
+        config["profile"] = True
+        config["profile_allocations"] = args.profile_allocations
+    if args.resume and args.checkpoint is None:
+        parser.error("--resume requires --checkpoint")
+    if args.resume:
+        # Everything else comes from the checkpoint
+        for option, value in [
+            ("--seed", args.seed),
+            ("--algorithm", args.algorithm),
+            ("--scheduler", args.scheduler),
+            ("--trace", args.trace),
+        ]:
+            if value is not None:
+                parser.error(f"{option} cannot be combined with --resume")
+
+    logger = setup_event_logger(
+        "headless_file",
+        args.log,
+        verbosity=args.verbosity,
+        structured=args.structured_log,
+    )
+    try:
+        if args.resume:
+            overrides = {}
+            if args.checkpoint_interval is not None:
+                overrides["checkpoint_interval"] = args.checkpoint_interval
+            metrics = resume_headless(
+                args.checkpoint,
+                max_events=args.max_events,
+                max_time=args.max_time,
+                logger=logger,
+                profile=config.get("profile", False),
+                profile_allocations=config.get("profile_allocations", False),
+                **overrides,
+            )
+        else:
+            metrics = run_headless(
+                config,
+                seed=args.seed,
+                max_events=args.max_events,
+                max_time=args.max_time,
+                logger=logger,
+            )
+    finally:
+        close_event_logger(logger)
+    print(json.dumps(metrics, indent=2))
+
+    return metrics
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+from collections.abc import Callable
+
+
+class Observer:
+    """
+    Samples the simulation every `rate` units of simulated time. Observers
+    are kept out of the event queue; the scheduler runs `callback(time)`
+    whenever the observer is due before the next robot event.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate: float,
+        callback: Callable[[float], None],
+        next_time: float = 0.0,
+    ):
+        if rate <= 0:
+            raise ValueError("Observer rate must be positive")
+
+        self.name = name
+        self.rate = rate
+        self.callback = callback
+        self.next_time = next_time
+        self.last_time: float | None = None
+
+    def sample(self, time: float) -> None:
+        self.last_time = time
+        self.callback(time)
+        self.next_time = time + self.rate
+
+    def set_rate(self, rate: float, current_time: float) -> None:
+        """Changes the rate; the next sample is `rate` after the last one"""
+        if rate <= 0:
+            raise ValueError("Observer rate must be positive")
+
+        self.rate = rate
+        if self.last_time is not None:
+            self.next_time = max(self.last_time + rate, current_time)
@@ -0,0 +1,132 @@
+from collections import defaultdict
+from collections.abc import Callable
+import logging
+import time
+import tracemalloc
+
+# handle_event exit code -> event type
+EVENT_TYPES = {0: "OBSERVER", 1: "LOOK", 2: "MOVE", 3: "WAIT", 4: "LOOK"}
+
+# Every phase timed by the Scheduler, Robot and SnapshotView, plus "other"
+PHASES = [
+    "queue_pop",
+    "queue_push",
+    "snapshot",
+    "multiplicity",
+    "visibility",
+    "compute",
+    "move",
+    "wait",
+    "logging",
+    "observers",
+    "other",
+]
+
+
+class Profiler:
+    """
+    Accumulates wall time and call counts for each phase of
+    Scheduler.handle_event. Phases may nest; a phase is only charged for
+    the time not spent in the phases it calls, so the times add up to the
+    total. With `allocations`, the memory allocated while handling each
+    event is traced with tracemalloc (which slows the run down a lot).
+    """
+
+    def __init__(self, allocations: bool = False):
+        self.allocations = allocations
+        self.times: defaultdict[str, float] = defaultdict(float)
+        self.calls: defaultdict[str, int] = defaultdict(int)
+        self.event_times: defaultdict[str, float] = defaultdict(float)
+        self.event_counts: defaultdict[str, int] = defaultdict(int)
+        self.allocated: defaultdict[str, int] = defaultdict(int)
+        # Time spent in nested phases, one entry per phase being timed
+        self._nested: list[float] = []
+        self._event_start = 0.0
+        self._allocated_before = 0
+        self._started_tracing = False
+        if allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def call(self, phase: str, function: Callable, *args, **kwargs):
+        """Calls `function` and charges its duration to `phase`"""
+        self._nested.append(0.0)
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.times[phase] += elapsed - self._nested.pop()
+            self.calls[phase] += 1
+            if self._nested:
+                self._nested[-1] += elapsed
+
+    def begin_event(self) -> None:
+        if self.allocations:
+            self._allocated_before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+        self._event_start = time.perf_counter()
+
+    def end_event(self, exit_code: int) -> None:
+        elapsed = time.perf_counter() - self._event_start
+        if exit_code < 0:
+            return
+
+        event_type = EVENT_TYPES[exit_code]
+        self.event_times[event_type] += elapsed
+        self.event_counts[event_type] += 1
+        if self.allocations:
+            _, peak = tracemalloc.get_traced_memory()
+            self.allocated[event_type] += peak - self._allocated_before
+
+    def report(self) -> dict:
+        """
+        Time and calls per phase, and time, count and (if traced) mean bytes
+        allocated per event type. `other` is the time spent in handle_event
+        outside of every phase.
+        """
+        total = sum(self.event_times.values())
+        phases = {
+            phase: {"time": self.times[phase], "calls": self.calls[phase]}
+            for phase in sorted(self.times, key=self.times.get, reverse=True)
+        }
+        phases["other"] = {
+            "time": max(total - sum(self.times.values()), 0.0),
+            "calls": sum(self.event_counts.values()),
+        }
+
+        events = {}
+        for event_type, count in self.event_counts.items():
+            events[event_type] = {
+                "count": count,
+                "time": self.event_times[event_type],
+            }
+            if self.allocations:
+                events[event_type]["allocated_bytes_per_event"] = (
+                    self.allocated[event_type] / count
+                )
+
+        return {"total_time": total, "phases": phases, "events": events}
+
+    def close(self) -> None:
+        """Stops tracing allocations if this profiler started it"""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+
+class ProfiledLogger:
+    """
+    Wraps a logger so the time spent in `log` is charged to the "logging"
+    phase. Everything else is passed through to the wrapped logger.
+    """
+
+    def __init__(self, logger: logging.Logger, profiler: Profiler):
+        self.logger = logger
+        self.profiler = profiler
+
+    def log(self, level: int, message: str, *args, **kwargs) -> None:
+        self.profiler.call("logging", self.logger.log, level, message, *args, **kwargs)
+
+    def __getattr__(self, name: str):
+        return getattr(self.logger, name)
@@ -0,0 +1,122 @@
+from enums import RandomMode
+import numpy as np
+
+BLOCK_SIZE = 4096
+
+
+class _VariateBlock:
+    """
+    Variates of one distribution drawn `block_size` at a time from their own
+    generator and handed out one by one. Only the generator state from
+    before the current block and the position in it are needed to restore.
+    """
+
+    def __init__(self, generator: np.random.Generator, draw: str, block_size: int):
+        self.generator = generator
+        self.draw = draw
+        self.block_size = block_size
+        self.block_state = generator.bit_generator.state
+        self.values: list[float] = []
+        self.index = 0
+
+    def next(self) -> float:
+        try:
+            value = self.values[self.index]
+        except IndexError:
+            self._refill()
+            value = self.values[0]
+        self.index += 1
+
+        return value
+
+    def _refill(self) -> None:
+        self.block_state = self.generator.bit_generator.state
+        self.values = getattr(self.generator, self.draw)(self.block_size).tolist()
+        self.index = 0
+
+    def get_state(self) -> dict:
+        return {"block_state": self.block_state, "index": self.index}
+
+    def set_state(self, state: dict) -> None:
+        self.generator.bit_generator.state = state["block_state"]
+        if state["index"] == 0:
+            self.block_state = state["block_state"]
+            self.values = []
+            self.index = 0
+            return
+
+        self._refill()
+        self.index = state["index"]
+
+
+class RandomStream:
+    """
+    Random variates for event times and movement.
+
+    BUFFERED draws standard exponential and uniform variates in blocks, each
+    from its own generator spawned from `seed`, so an event costs a list
+    lookup instead of a call into NumPy. Runs are reproducible for a given
+    seed and block size, but differ from runs made before buffering.
+
+    COMPAT draws every variate from `generator` on demand, interleaved with
+    the robots' draws, so earlier runs give the same sequence of events,
+    with positions equal up to floating-point rounding.
+    """
+
+    def __init__(
+        self,
+        generator: np.random.Generator,
+        seed: int,
+        mode: str | RandomMode = RandomMode.BUFFERED,
+        block_size: int = BLOCK_SIZE,
+    ):
+        self.generator = generator
+        self.mode = RandomMode(mode)
+        self.buffered = self.mode == RandomMode.BUFFERED
+
+        if self.buffered:
+            exponential_seed, uniform_seed = np.random.SeedSequence(seed).spawn(2)
+            self._exponential = _VariateBlock(
+                np.random.default_rng(exponential_seed),
+                "standard_exponential",
+                block_size,
+            )
+            self._uniform = _VariateBlock(
+                np.random.default_rng(uniform_seed), "random", block_size
+            )
+
+    def exponential(self, scale: float) -> float:
+        if not self.buffered:
+            return self.generator.exponential(scale=scale)
+
+        return scale * self._exponential.next()
+
+    def exponentials(self, scale: float, size: int) -> np.ndarray:
+        if not self.buffered:
+            return self.generator.exponential(scale=scale, size=size)
+
+        return scale * np.array([self._exponential.next() for _ in range(size)])
+
+    def uniform(self) -> float:
+        """Uniform in [0, 1)"""
+        if not self.buffered:
+            return self.generator.uniform()
+
+        return self._uniform.next()
+
+    def get_state(self) -> dict | None:
+        """The buffers' state; COMPAT has none beyond `generator`"""
+        if not self.buffered:
+            return None
+
+        return {
+            "exponential": self._exponential.get_state(),
+            "uniform": self._uniform.get_state(),
+        }
+
+    def set_state(self, state: dict | None) -> None:
+        if not self.buffered:
+            return
+
+        self._exponential.set_state(state["exponential"])
+        self._uniform.set_state(state["uniform"])
@@ -1,13 +1,32 @@
 from enums import RobotState, Algorithm
 from type_defs import *
+from snapshot import SnapshotView
+from centroid import CentroidTracker
+from profiler import Profiler
+from event_log import log_event
+from sec import smallest_enclosing_circle, circle_support, still_enclosing
 from typing import Callable
+import numpy as np
 import math
 import logging
 
 
 class Robot:
-    _logger: logging.Logger | None = None
-    _generator = None
+    # Fields that change during a simulation, see get_state/set_state
+    MUTABLE_FIELDS = (
+        "coordinates",
+        "state",
+        "start_position",
+        "calculated_position",
+        "start_time",
+        "end_time",
+        "frozen",
+        "terminated",
+        "travelled_distance",
+        "number_of_activations",
+        "sec",
+        "sec_support",
+    )
 
     def __init__(
         self,
@@ -23,8 +42,11 @@ class Robot:
         multiplicity_detection: bool = False,
         rigid_movement: bool = False,
         threshold_precision: float = 5,
+        generator: np.random.Generator | None = None,
+        legacy_algorithms: bool = False,
     ):
-        Robot._logger = logger
+        self.logger = logger
+        self.generator = generator if generator is not None else np.random.default_rng()
         self.speed = speed
         self.color = color
         self.visibility_radius = visibility_radius
@@ -39,59 +61,89 @@ class Robot:
         self.calculated_position = None
         self.number_of_activations = 0
         self.travelled_distance = 0.0
-        self.snapshot: dict[Id, SnapshotDetails] | None = None
+        self.snapshot: SnapshotView | None = None
         self.coordinates = coordinates
         self.id = id
         self.threshold_precision = threshold_precision
         self.frozen = False  # true if we skipped move step
         self.terminated = False
         self.sec = None  # Stores the calculated SEC
+        # Robots on the boundary of the last SEC computed by Welzl, with
+        # their positions, so the next LOOK can reuse it
+        self.sec_support: dict[Id, tuple[float, float]] | None = None
+        # Reproduce earlier runs: recursive Welzl from scratch on every LOOK
+        self.legacy_algorithms = legacy_algorithms
+        # Set by the Scheduler for Gathering with unlimited visibility
+        self.centroid: CentroidTracker | None = None
+        # Set by Scheduler.enable_profiling
+        self.profiler: Profiler | None = None
 
-        match algorithm:
-            case "Gathering":
-                self.algorithm = Algorithm.GATHERING
-            case "SEC":
-                self.algorithm = Algorithm.SEC
+        self.algorithm = Algorithm(algorithm)
+
+    def get_state(self) -> dict:
+        return {field: getattr(self, field) for field in Robot.MUTABLE_FIELDS}
+
+    def set_state(self, state: dict) -> None:
+        for field in Robot.MUTABLE_FIELDS:
+            setattr(self, field, state[field])
 
     def look(
         self,
-        snapshot: dict[Id, SnapshotDetails],
+        snapshot: SnapshotView,
         time: float,
     ) -> None:
         self.state = RobotState.LOOK
 
-        self.snapshot = {}
-        for key, value in snapshot.items():
-            if self._robot_is_visible(value.pos):
-                transformed_pos = self._convert_coordinate(value.pos)
-                self.snapshot[key] = SnapshotDetails(
-                    transformed_pos,
-                    value.state,
-                    value.frozen,
-                    value.terminated,
-                    value.multiplicity,
-                )
+        # Only materialized once the algorithm reads it
+        if self.profiler is not None:
+            self.snapshot = self.profiler.call(
+                "visibility",
+                snapshot.visible_from,
+                self.coordinates,
+                self.visibility_radius,
+                self._convert_coordinate,
+            )
+        else:
+            self.snapshot = snapshot.visible_from(
+                self.coordinates, self.visibility_radius, self._convert_coordinate
+            )
 
-        Robot._logger.info(
-            f"[{time}] {{R{self.id}}} LOOK    -- Snapshot {self.prettify_snapshot(snapshot)}"
-        )
+        if self.logger.isEnabledFor(logging.DEBUG):
+            # Built here: the snapshot must not be read from the log thread
+            log_event(
+                self.logger,
+                logging.DEBUG,
+                time,
+                self.id,
+                "LOOK",
+                "LOOK    -- Snapshot %s",
+                self.prettify_snapshot(self.snapshot),
+            )
+        else:
+            log_event(self.logger, logging.INFO, time, self.id, "LOOK", "LOOK")
 
         if len(self.snapshot) == 1:
             self.frozen = True
             self.terminated = True
 
-            self.wait(time)
+            self._wait_profiled(time)
             return
 
         algo, algo_terminal = self._select_algorithm()
-        self.calculated_position = self._compute(algo, algo_terminal)
-        pos_str = (
-            f"({self.calculated_position[0]}, {self.calculated_position[1]})"
-            if self.calculated_position
-            else ""
-        )
-        Robot._logger.info(
-            f"[{time}] {{R{self.id}}} COMPUTE -- Computed Pos: {pos_str}"
+        if self.profiler is not None:
+            self.calculated_position = self.profiler.call(
+                "compute", self._compute, algo, algo_terminal
+            )
+        else:
+            self.calculated_position = self._compute(algo, algo_terminal)
+        log_event(
+            self.logger,
+            logging.INFO,
+            time,
+            self.id,
+            "COMPUTE",
+            "COMPUTE -- Computed Pos: (%s, %s)",
+            *self.calculated_position,
         )
 
         if (
@@ -99,10 +151,16 @@ class Robot:
             < 10**-self.threshold_precision
         ):
             self.frozen = True
-            self.wait(time)
+            self._wait_profiled(time)
         else:
             self.frozen = False
 
+    def _wait_profiled(self, time: float) -> None:
+        if self.profiler is not None:
+            self.profiler.call("wait", self.wait, time)
+        else:
+            self.wait(time)
+
     def _compute(
         self,
         algo: Callable[[], tuple[Coordinates, list[any]]],
@@ -121,7 +179,7 @@ class Robot:
 
     def move(self, start_time: float) -> None:
         self.state = RobotState.MOVE
-        Robot._logger.info(f"[{start_time}] {{R{self.id}}} MOVE")
+        log_event(self.logger, logging.INFO, start_time, self.id, "MOVE", "MOVE")
 
         self.start_time = start_time
         self.start_position = self.coordinates
@@ -135,8 +193,15 @@ class Robot:
         current_distance = math.dist(self.start_position, self.coordinates)
         self.travelled_distance += current_distance
 
-        Robot._logger.info(
-            f"[{time}] {{R{self.id}}} WAIT    -- Distance: {current_distance} | Total Distance: {self.travelled_distance} units"
+        log_event(
+            self.logger,
+            logging.INFO,
+            time,
+            self.id,
+            "WAIT",
+            "WAIT    -- Distance: %s | Total Distance: %s units",
+            current_distance,
+            self.travelled_distance,
         )
 
         self.start_time = None
@@ -180,12 +245,10 @@ class Robot:
     def _convert_coordinate(self, coord: Coordinates) -> Coordinates:
         return coord
 
-    def _robot_is_visible(self, coord: Coordinates):
-        distance = math.dist(self.coordinates, coord)
-
-        return self.visibility_radius > distance
-
     def _midpoint(self) -> tuple[Coordinates, list[any]]:
+        if self.centroid is not None:
+            return (self.centroid.centroid(self.snapshot.time), [])
+
         x = y = 0
         for _, value in self.snapshot.items():
             x += value.pos.x
@@ -197,6 +260,10 @@ class Robot:
         return (Coordinates(x, y), [])
 
     def _midpoint_terminal(self, coord: Coordinates, args=None) -> bool:
+        if self.centroid is not None:
+            within = self.centroid.within(coord, 10**-self.threshold_precision)
+            if within is not None:
+                return within
 
         robot_ids = self.snapshot.keys()
         for id in robot_ids:
@@ -239,8 +306,14 @@ class Robot:
             destination = self._closest_point_on_circle(self.sec, self.coordinates)
         else:
             # self.sec = self._sec()
-            self.sec = self._sec_welzl(ids)
+            if self.legacy_algorithms:
+                self.sec = self._sec_welzl(ids)
+            else:
+                self.sec = self._sec_cached(ids)
             destination = self._closest_point_on_circle(self.sec, self.coordinates)
+            return (destination, [self.sec])
+
+        self.sec_support = None
         return (destination, [self.sec])
 
     def _sec_terminal(self, _, args: list[Circle]) -> bool:
@@ -257,6 +330,28 @@ class Robot:
                 return False
         return True
 
+    def _sec_cached(self, ids: list[Id]) -> Circle:
+        """
+        Returns the SEC of the visible robots, reusing the previous one if
+        none of the robots on its boundary moved or left the view and every
+        visible robot is still inside it. Otherwise solves it again.
+        """
+        snapshot_ids = self.snapshot.ids
+        positions = self.snapshot.positions
+        if still_enclosing(
+            self.sec, self.sec_support, snapshot_ids, positions, self.threshold_precision
+        ):
+            return self.sec
+
+        circle = smallest_enclosing_circle(
+            positions, self.threshold_precision, self.generator
+        )
+        self.sec_support = circle_support(
+            circle, snapshot_ids, positions, self.threshold_precision
+        )
+
+        return circle
+
     def _sec_welzl(self, points: list[Id]) -> Circle:
         """
         Returns smallest enclosing circle given number of robots in the form of
@@ -264,7 +359,7 @@ class Robot:
         Time Complexity: O(n)
         """
         points_copy = points.copy()
-        Robot._generator.shuffle(points_copy)
+        self.generator.shuffle(points_copy)
         return self._sec_welzl_recur(points_copy, [], len(points_copy))
 
     def _sec(self) -> Circle:
@@ -314,7 +409,7 @@ class Robot:
     ) -> Circle:
         if n == 0 or len(R) == 3:
             return self._min_circle(R)
-        idx = Robot._generator.integers(0, n - 1) if n > 1 else 0
+        idx = self.generator.integers(0, n - 1) if n > 1 else 0
         p = self.snapshot[points[idx]].pos
         points[idx], points[n - 1] = points[n - 1], points[idx]
         c = self._sec_welzl_recur(points, R.copy(), n - 1)
@@ -441,7 +536,7 @@ class Robot:
             return Coordinates(0, 0)
         return Coordinates((cy * b - by * c) / (2 * d), (bx * c - cx * b) / (2 * d))
 
-    def prettify_snapshot(self, snapshot: dict[Id, SnapshotDetails]) -> str:
+    def prettify_snapshot(self, snapshot: SnapshotView) -> str:
         result = ""
         for key, value in snapshot.items():
             frozen = "*" if value.frozen == True else ""
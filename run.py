@@ -1,7 +1,12 @@
 import json
 import socket
-from enums import Algorithm
+from enums import Algorithm, FrameDropPolicy, SchedulerType
 from scheduler import Scheduler
+from synchronous import SyncScheduler
+from headless import generate_initial_positions
+from event_log import setup_event_logger, close_event_logger
+from streaming import FrameStream, FrameEmitter
+from simulations import Simulation, SimulationManager
 import numpy as np
 import logging
 from flask import Flask, jsonify, request, Response, send_from_directory
@@ -21,29 +26,13 @@ def get_log_name():
 
 
 def setup_logger(simulation_id, algo_name):
-    logger = logging.getLogger(f"app_{simulation_id}")
-    logger.setLevel(logging.INFO)
-
     # Add a new file handler
     log_dir = f"./logs/{algo_name}/"
     os.makedirs(log_dir, exist_ok=True)
     log_file = os.path.join(log_dir, f"{get_log_name()}")
 
-    new_file_handler = logging.FileHandler(log_file)
-    formatter = logging.Formatter("")
-    new_file_handler.setFormatter(formatter)
-    logger.addHandler(new_file_handler)
-
-    return logger
-
-
-def generate_initial_positions(generator, width_bound, height_bound, n):
-    x_positions = generator.uniform(low=-width_bound, high=height_bound, size=(n,))
-    y_positions = generator.uniform(low=-height_bound, high=height_bound, size=(n,))
-
-    positions = np.column_stack((x_positions, y_positions))
-
-    return positions
+    # One line per event; LOOK snapshots (verbosity 2) slow UI runs down
+    return setup_event_logger(f"app_{simulation_id}", log_file, verbosity=1)
 
 
 # Disable Flask’s default logging to the root logger
@@ -55,102 +44,166 @@ log.setLevel(logging.ERROR)  # Set Flask's logging to a different level or disab
 app = Flask(__name__, static_folder="static")
 socketio = SocketIO(app)
 
-simulation_thread = None
-terminate_flag = False
-simulation_id = 0
-logger = None
+
+def report_simulation_error(simulation: Simulation, error: Exception):
+    # Without an end signal the client would wait for frames forever
+    with app.app_context():
+        socketio.emit(
+            "simulation_error",
+            json.dumps({"simulation_id": simulation.id, "error": repr(error)}),
+            to=simulation.room,
+        )
+        socketio.emit("simulation_end", "END", to=simulation.room)
+
+
+simulations = SimulationManager(
+    max_workers=int(os.environ.get("LCM_SIMULATION_WORKERS", os.cpu_count() or 4)),
+    on_error=report_simulation_error,
+)
 
 
 # WebSocket event handler for the simulation
 @socketio.on("start_simulation")
 def handle_simulation_request(data):
-    global simulation_thread, terminate_flag, logger
-
-    # Terminate existing simulation thread
-    if simulation_thread and simulation_thread.is_alive():
-        logger.info("Simulation Interrupted... (A new simulation was requested)")
-        terminate_flag = True
-        simulation_thread.join()
-
-    # Reset the termination flag and start a new simulation thread
-    terminate_flag = False
-
-    seed = data["random_seed"]
-    seed = 2708382154
-    generator = np.random.default_rng(seed=seed)
-    num_robots = data["num_of_robots"]
-    initial_positions: list = data["initial_positions"]
-
-    if len(initial_positions) != 0:
-        # User defined
-        initial_positions = data["initial_positions"]
-        num_robots = len(initial_positions)
-    else:
-        # Random
-        initial_positions = generate_initial_positions(
-            generator, data["width_bound"], data["height_bound"], num_robots
+    # Every client is in a room of its own; a new request only replaces the
+    # client's own simulation
+    room = request.sid
+
+    def run_simulation(simulation: Simulation):
+        seed = data["random_seed"]
+        seed = 2708382154
+        generator = np.random.default_rng(seed=seed)
+        num_robots = data["num_of_robots"]
+        initial_positions: list = data["initial_positions"]
+
+        if len(initial_positions) != 0:
+            # User defined
+            initial_positions = data["initial_positions"]
+            num_robots = len(initial_positions)
+        else:
+            # Random
+            initial_positions = generate_initial_positions(
+                generator, data["width_bound"], data["height_bound"], num_robots
+            )
+
+        logger = setup_logger(simulation.id, data["algorithm"])
+        logger.info("Config:\n\n%s\n", json.dumps(data, indent=2))
+
+        scheduler_type = SchedulerType(data.get("scheduler_type", SchedulerType.ASYNC))
+        if scheduler_type == SchedulerType.ASYNC:
+            scheduler = Scheduler(
+                logger=logger,
+                seed=seed,
+                num_of_robots=num_robots,
+                initial_positions=initial_positions,
+                robot_speeds=data["robot_speeds"],
+                rigid_movement=data["rigid_movement"],
+                threshold_precision=data["threshold_precision"],
+                sampling_rate=data["sampling_rate"],
+                labmda_rate=data["labmda_rate"],
+                algorithm=data["algorithm"],
+                visibility_radius=data["visibility_radius"],
+                multiplicity_detection=data.get("multiplicity_detection", False),
+            )
+        else:
+            scheduler = SyncScheduler(
+                logger=logger,
+                seed=seed,
+                num_of_robots=num_robots,
+                initial_positions=initial_positions,
+                algorithm=data["algorithm"],
+                scheduler_type=scheduler_type,
+                visibility_radius=data["visibility_radius"],
+                rigid_movement=data["rigid_movement"],
+                threshold_precision=data["threshold_precision"],
+            )
+
+        # Only the asynchronous Scheduler can be profiled
+        profiling = data.get("profile", False) and isinstance(scheduler, Scheduler)
+        if profiling:
+            scheduler.enable_profiling(data.get("profile_allocations", False))
+
+        stream = FrameStream(
+            simulation.id,
+            fps=data.get("stream_fps", 30),
+            binary=data.get("binary_frames", False),
+        )
+
+        def emit_frame(frame):
+            with app.app_context():
+                socketio.emit("simulation_data", frame, to=room)
+
+        # Frames are encoded and emitted on the emitter's thread so a slow
+        # client never holds up the simulation
+        emitter = FrameEmitter(
+            emit_frame,
+            stream,
+            maxsize=data.get("frame_queue_size", 64),
+            policy=data.get("frame_drop_policy", FrameDropPolicy.DROP_OLDEST),
         )
 
-    logger = setup_logger(simulation_id, data["algorithm"])
-    logger.info("Config:\n\n%s\n", json.dumps(data, indent=2))
-
-    scheduler = Scheduler(
-        logger=logger,
-        seed=seed,
-        num_of_robots=num_robots,
-        initial_positions=initial_positions,
-        robot_speeds=data["robot_speeds"],
-        rigid_movement=data["rigid_movement"],
-        threshold_precision=data["threshold_precision"],
-        sampling_rate=data["sampling_rate"],
-        labmda_rate=data["labmda_rate"],
-        algorithm=data["algorithm"],
-        visibility_radius=data["visibility_radius"],
-    )
-
-    def run_simulation():
-        global terminate_flag, simulation_id
-
-        simulation_id += 1
-
-        with app.app_context():
-            socketio.emit("simulation_start", simulation_id)
-            while terminate_flag != True:
-                exit_code = scheduler.handle_event()
-                if exit_code == 0:
-                    snapshots = scheduler.visualization_snapshots
-                    if len(snapshots) > 0:
-                        socketio.emit(
-                            "simulation_data",
-                            json.dumps(
-                                {
-                                    "simulation_id": simulation_id,
-                                    "snapshot": scheduler.visualization_snapshots[-1],
-                                }
-                            ),
-                        )
-
-                if exit_code < 0:
-                    # Signal the end of the simulation
-                    if scheduler.robots[0].algorithm == Algorithm.SEC:
-                        socketio.emit(
-                            "smallest_enclosing_circle",
-                            json.dumps(
-                                {
-                                    "simulation_id": simulation_id,
-                                    "sec": [
-                                        scheduler.robots[i].sec
-                                        for i in range(num_robots)
-                                    ],
-                                }
-                            ),
-                        )
-                    socketio.emit("simulation_end", "END")
-                    break
-
-    # Start a thread for the simulation to not block websocket
-    simulation_thread = threading.Thread(target=run_simulation)
-    simulation_thread.start()
+        try:
+            with app.app_context():
+                socketio.emit("simulation_start", simulation.id, to=room)
+                # A failed emitter is reported when it is closed
+                while not simulation.cancelled.is_set() and emitter.error is None:
+                    exit_code = scheduler.handle_event()
+                    if exit_code == 0:
+                        snapshots = scheduler.visualization_snapshots
+                        if len(snapshots) > 0:
+                            emitter.put(*snapshots[-1])
+
+                    if exit_code < 0:
+                        # Send the frames still queued before the end signal
+                        emitter.close()
+
+                        # Signal the end of the simulation
+                        if Algorithm(data["algorithm"]) == Algorithm.SEC:
+                            socketio.emit(
+                                "smallest_enclosing_circle",
+                                json.dumps(
+                                    {
+                                        "simulation_id": simulation.id,
+                                        "sec": (
+                                            scheduler.secs
+                                            if isinstance(scheduler, SyncScheduler)
+                                            else [robot.sec for robot in scheduler.robots]
+                                        ),
+                                    }
+                                ),
+                                to=room,
+                            )
+                        if profiling:
+                            socketio.emit(
+                                "profile_report",
+                                json.dumps(
+                                    {
+                                        "simulation_id": simulation.id,
+                                        "profile": scheduler.profiler.report(),
+                                    }
+                                ),
+                                to=room,
+                            )
+                        socketio.emit("simulation_end", "END", to=room)
+                        break
+
+                if simulation.cancelled.is_set():
+                    logger.info(
+                        "Simulation Interrupted... (A new simulation was requested)"
+                    )
+        finally:
+            try:
+                emitter.close()
+            finally:
+                if emitter.queue.dropped:
+                    logger.info(
+                        "Dropped %s visualization frames", emitter.queue.dropped
+                    )
+                scheduler.close()
+                close_event_logger(logger)
+
+    # Run on the worker pool to not block websocket
+    simulations.start(room, run_simulation)
 
 
 @socketio.on("connect")
@@ -160,6 +213,7 @@ def client_connect():
 
 @socketio.on("disconnect")
 def client_disconnect():
+    simulations.cancel(request.sid, wait=False)
     print("Client disconnected")
 
 
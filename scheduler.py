@@ -1,16 +1,29 @@
 from enums import *
 from type_defs import *
 from robot import Robot
+from world_state import WorldState
+from snapshot import SnapshotView, SnapshotHistory, MultiplicityCache
+from spatial_index import SpatialGrid
+from trajectory import TraceWriter
+from event_log import log_event
+from observer import Observer
+from event_queue import EventQueue
+from convergence import ConvergenceDetector
+from centroid import CentroidTracker
+from random_stream import RandomStream
+from profiler import Profiler, ProfiledLogger
+from collections.abc import Callable
+from collections import deque
 import numpy as np
-import heapq
 import math
 import logging
+import os
+import pickle
 
+CHECKPOINT_VERSION = 1
 
-class Scheduler:
-
-    _logger: logging.Logger | None = None
 
+class Scheduler:
     def __init__(
         self,
         logger: logging.Logger,
@@ -30,28 +43,66 @@ class Scheduler:
         threshold_precision: int = 5,
         sampling_rate: float = 0.2,
         labmda_rate: float = 5,
+        random_mode: str = RandomMode.BUFFERED,
+        legacy_algorithms: bool = False,
+        stop_on_convergence: bool = True,
+        visualization: bool = True,
+        history_policy: str = HistoryPolicy.NONE,
+        history_size: int = 100,
+        history_path: str | None = None,
+        trace_path: str | None = None,
+        keyframe_interval: int = 10000,
+        checkpoint_path: str | None = None,
+        checkpoint_interval: int = 100000,
     ):
-        Scheduler._logger = logger
+        # Constructor arguments, stored in checkpoints to rebuild the Scheduler
+        self.parameters = {
+            key: value
+            for key, value in locals().items()
+            if key not in ("self", "logger")
+        }
+        self.logger = logger
         self.seed = seed
+        self.generator = np.random.default_rng(seed=self.seed)
+        self.random = RandomStream(self.generator, self.seed, random_mode)
         self.terminate = False
+        self.exit_reason: str | None = None  # Why the run stopped early
         self.rigid_movement = rigid_movement
         self.multiplicity_detection = multiplicity_detection
         self.probability_distribution = probability_distribution
         self.scheduler_type = scheduler_type
         self.robot_speeds = robot_speeds
+        if isinstance(visibility_radius, (int, float)) and visibility_radius <= 0:
+            # Robots see strictly closer than the radius, so not even themselves
+            raise ValueError("visibility_radius must be positive, or None")
         self.visibility_radius = visibility_radius
         self.robot_orientations = robot_orientations
         self.robot_colors = robot_colors
         self.obstructed_visibility = obstructed_visibility
         self.threshold_precision = threshold_precision
-        self.snapshot_history: list[tuple[Time, dict[int, SnapshotDetails]]] = []
-        self.visualization_snapshots: list[tuple[Time, dict[int, SnapshotDetails]]] = []
+        self.snapshot_history = SnapshotHistory(
+            history_policy, history_size, history_path, threshold_precision
+        )
+        # Only the latest frame is ever sent to the client
+        self.visualization_snapshots: deque[tuple[Time, dict[Id, SnapshotDetails]]]
+        self.visualization_snapshots = deque(maxlen=1)
         self.sampling_rate = sampling_rate
         self.lambda_rate = labmda_rate  # Average number of events per time unit
+        self.visualization = visualization  # Disable to skip visualization events
+        self.observers: dict[str, Observer] = {}
+        self.finished_observers: set[str] = set()  # Took their last sample
+        self.profiler: Profiler | None = None  # See enable_profiling
+        self.current_time = 0.0
+        self.event_count = 0
+        self.keyframe_interval = keyframe_interval  # Events between trace keyframes
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval  # Events between checkpoints
         self.robots: list[Robot] = []
 
         if isinstance(robot_speeds, float) or isinstance(robot_speeds, int):
             robot_speeds_list = [robot_speeds] * num_of_robots
+        else:
+            robot_speeds_list = robot_speeds
 
         for i in range(num_of_robots):
             new_robot = Robot(
@@ -63,37 +114,222 @@ class Scheduler:
                 algorithm=algorithm,
                 visibility_radius=self.visibility_radius,
                 rigid_movement=self.rigid_movement,
+                generator=self.generator,
+                legacy_algorithms=legacy_algorithms,
             )
             self.robots.append(new_robot)
 
+        self.world = WorldState(
+            initial_positions[:num_of_robots], robot_speeds_list, threshold_precision
+        )
+        # Reused by snapshots of the same robots while nothing has moved
+        self.multiplicity_cache = MultiplicityCache()
+
+        self.trace: TraceWriter | None = None
+        if trace_path is not None:
+            self.trace = TraceWriter(trace_path, robot_speeds_list, threshold_precision)
+            for robot in self.robots:
+                self.trace.record(0.0, robot)
+
+        # Only worth indexing when robots cannot see the whole world
+        self.spatial_index: SpatialGrid | None = None
+        if self.visibility_radius is not None:
+            self.spatial_index = SpatialGrid(self.visibility_radius)
+            for robot in self.robots:
+                self.spatial_index.update(robot.id, robot.state, robot.coordinates)
+
+        # Gathering with unlimited visibility reads the centroid of every robot
+        self.centroid: CentroidTracker | None = None
+        if (
+            not legacy_algorithms
+            and Algorithm(algorithm) == Algorithm.GATHERING
+            and self.visibility_radius is None
+        ):
+            self.centroid = CentroidTracker(self.world)
+            for robot in self.robots:
+                robot.centroid = self.centroid
+
+        self.convergence: ConvergenceDetector | None = None
+        if stop_on_convergence:
+            self.convergence = ConvergenceDetector(
+                self.world, Algorithm(algorithm), threshold_precision
+            )
+
         self.initialize_queue_exponential()
-        Robot._generator = self.generator
 
-    def get_snapshot(
-        self, time: float, visualization_snapshot: bool = False
-    ) -> dict[int, SnapshotDetails]:
-        snapshot = {}
+        if self.visualization:
+            self.attach_observer(
+                "visualization",
+                self.sampling_rate,
+                lambda time: self.get_snapshot(time, visualization_snapshot=True),
+                start=0.0,
+            )
+
+    def attach_observer(
+        self,
+        name: str,
+        rate: float,
+        callback: Callable[[float], None],
+        start: float | None = None,
+    ) -> Observer:
+        """
+        Calls `callback(time)` every `rate` units of simulated time, starting
+        at `start` (default: now). Each call is reported by handle_event with
+        exit code 0.
+        """
+        if name in self.observers:
+            raise ValueError(f"An observer named {name!r} is already attached")
+
+        observer = Observer(
+            name, rate, callback, self.current_time if start is None else start
+        )
+        self.observers[name] = observer
+        self.finished_observers.discard(name)
+        self.event_queue.push_observer(name, observer.next_time)
+
+        return observer
+
+    def detach_observer(self, name: str) -> Observer | None:
+        self.event_queue.cancel_observer(name)
+        return self.observers.pop(name, None)
+
+    def set_observer_rate(self, name: str, rate: float) -> None:
+        observer = self.observers[name]
+        observer.set_rate(rate, self.current_time)
+        self.event_queue.push_observer(name, observer.next_time)
+
+    def enable_profiling(self, allocations: bool = False) -> Profiler:
+        """
+        Times every phase of handle_event from now on, and with `allocations`
+        also traces the memory allocated per event. Read the results with
+        `scheduler.profiler.report()`.
+        """
+        if self.profiler is not None:
+            self.disable_profiling()
+
+        self.profiler = Profiler(allocations)
+        self.logger = ProfiledLogger(self.logger, self.profiler)
         for robot in self.robots:
-            snapshot[robot.id] = SnapshotDetails(
-                robot.get_position(time), robot.state, robot.frozen, robot.terminated, 1
+            robot.logger = self.logger
+            robot.profiler = self.profiler
+
+        return self.profiler
+
+    def disable_profiling(self) -> Profiler | None:
+        profiler = self.profiler
+        if profiler is None:
+            return None
+
+        self.profiler = None
+        self.logger = self.logger.logger
+        for robot in self.robots:
+            robot.logger = self.logger
+            robot.profiler = None
+        profiler.close()
+
+        return profiler
+
+    def get_snapshot(
+        self,
+        time: float,
+        visualization_snapshot: bool = False,
+        ids: np.ndarray | None = None,
+    ) -> SnapshotView:
+        """
+        Snapshot of the whole world, or only of the robots in `ids`. Positions
+        are computed up front; everything else is built on first access.
+        """
+        if self.profiler is not None:
+            return self.profiler.call(
+                "snapshot", self._get_snapshot, time, visualization_snapshot, ids
+            )
+        return self._get_snapshot(time, visualization_snapshot, ids)
+
+    def _get_snapshot(
+        self,
+        time: float,
+        visualization_snapshot: bool,
+        ids: np.ndarray | None,
+    ) -> SnapshotView:
+        world = self.world
+        if ids is None:
+            ids = np.arange(len(world))
+            states = world.states.copy()
+            frozen = world.frozen.copy()
+            terminated = world.terminated.copy()
+        else:
+            states, frozen, terminated = (
+                world.states[ids],
+                world.frozen[ids],
+                world.terminated[ids],
             )
 
-        self._detect_multiplicity(snapshot)  # in-place
+        snapshot = SnapshotView(
+            time,
+            ids,
+            world.positions_at(time, ids),
+            states,
+            frozen,
+            terminated,
+            self.threshold_precision,
+        )
+        snapshot.profiler = self.profiler
+        # Reused until a robot moves, see WorldState.version
+        snapshot.multiplicity_cache = self.multiplicity_cache
+        snapshot.multiplicity_key = world.positions_key(time)
+        snapshot.multiplicity_detection = self.multiplicity_detection
         if visualization_snapshot:
-            self.visualization_snapshots.append((time, snapshot))
+            self.visualization_snapshots.append((time, snapshot.materialize()))
         else:
             self.snapshot_history.append((time, snapshot))
 
         return snapshot
 
-    def generate_event(self, current_event: Event) -> None:
-        # Visualization events
-        if current_event.state == None and len(self.priority_queue) > 0:
-            new_event_time = current_event.time + self.sampling_rate
-            new_event = Event(new_event_time, -1, None)
-            heapq.heappush(self.priority_queue, new_event)
-            return
+    def _visible_candidates(self, robot: Robot, time: float) -> np.ndarray | None:
+        """
+        Sorted ids of the robots that may be visible to `robot`, taken from the
+        spatial index. Returns None when every robot has to be considered.
+        The exact visibility check is still done by `Robot.look`.
+        """
+        if self.spatial_index is None:
+            return None
+
+        radius = robot.visibility_radius
+        ids = self.spatial_index.query(robot.coordinates, radius)
+
+        moving = self.spatial_index.moving
+        if moving:
+            moving_ids = np.fromiter(moving, dtype=np.intp, count=len(moving))
+            moving_positions = self.world.positions_at(time, moving_ids)
+            distance = np.hypot(
+                moving_positions[:, 0] - robot.coordinates[0],
+                moving_positions[:, 1] - robot.coordinates[1],
+            )
+            # Small margin so the exact check in Robot.look has the final say
+            in_range = distance <= radius + 10**-self.threshold_precision
+            ids.extend(moving_ids[in_range].tolist())
+
+        candidates = np.array(ids, dtype=np.intp)
+        candidates.sort()
+
+        return candidates
+
+    def _sync_robot(self, robot: Robot, record: bool = True) -> None:
+        """
+        Propagates a robot's mutable fields to the world state and index, and
+        records them in the trace unless `record` is False
+        """
+        self.world.update(robot)
+        if record and self.trace is not None:
+            self.trace.record(self.current_time, robot)
+        if self.spatial_index is not None:
+            self.spatial_index.update(robot.id, robot.state, robot.coordinates)
+        if self.centroid is not None:
+            self.centroid.update(robot.id)
+        if self.convergence is not None:
+            self.convergence.update(robot.id)
 
+    def generate_event(self, current_event: Event) -> None:
         new_event_time = 0.0
         robot = self.robots[current_event.id]
 
@@ -103,58 +339,291 @@ class Scheduler:
             if self.rigid_movement == True:
                 distance = math.dist(robot.calculated_position, robot.start_position)
             else:
-                percentage = 1 - self.generator.uniform()  # range of values is (0,1]
-                Scheduler._logger.info(f"percentage of journey: {percentage}")
+                percentage = 1 - self.random.uniform()  # range of values is (0,1]
+                log_event(
+                    self.logger,
+                    logging.INFO,
+                    current_event.time,
+                    robot.id,
+                    "MOVE",
+                    "percentage of journey: %s",
+                    percentage,
+                )
                 distance = percentage * math.dist(
                     robot.calculated_position, robot.start_position
                 )
             new_event_time = current_event.time + (distance / robot.speed)
         else:
-            new_event_time = current_event.time + self.generator.exponential(
-                scale=1 / self.lambda_rate
+            new_event_time = current_event.time + self.random.exponential(
+                1 / self.lambda_rate
             )
 
         new_event_state = robot.state.next_state()
 
         priority_event = Event(new_event_time, current_event.id, new_event_state)
 
-        heapq.heappush(self.priority_queue, priority_event)
+        if self.profiler is not None:
+            self.profiler.call("queue_push", self.event_queue.push, priority_event)
+        else:
+            self.event_queue.push(priority_event)
 
     def handle_event(self) -> int:
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.begin_event()
+        exit_code = self._process_event()
+
+        if exit_code > 0 and self.convergence is not None and not self.terminate:
+            reason = self.convergence.check()
+            if reason is not None:
+                self.stop(reason)
+
+        if exit_code >= 0:
+            self.event_count += 1
+            if (
+                self.trace is not None
+                and self.event_count % self.keyframe_interval == 0
+            ):
+                self.trace.keyframe(self.current_time, self.get_state())
+            if (
+                self.checkpoint_path is not None
+                and self.event_count % self.checkpoint_interval == 0
+            ):
+                self.write_checkpoint()
+
+        if profiler is not None:
+            profiler.end_event(exit_code)
+
+        return exit_code
+
+    def _process_event(self) -> int:
         exit_code = -1
+        event_queue = self.event_queue
+        profiler = self.profiler
+
+        if event_queue.next_is_observer():
+            time, name = event_queue.peek_observer()
+            observer = self.observers[name]
+            self.current_time = time
+            if profiler is not None:
+                profiler.call("observers", observer.sample, time)
+            else:
+                observer.sample(time)
+            # Every observer takes one last sample once no robot events are left
+            if event_queue:
+                event_queue.push_observer(name, observer.next_time)
+            else:
+                self.detach_observer(name)
+                self.finished_observers.add(name)
+            return 0
 
-        if len(self.priority_queue) == 0:
+        if not event_queue:
             return exit_code
 
-        current_event = heapq.heappop(self.priority_queue)
+        if profiler is not None:
+            current_event = profiler.call("queue_pop", event_queue.pop)
+        else:
+            current_event = event_queue.pop()
 
         event_state = current_event.state
 
         time = current_event.time
+        self.current_time = time
 
-        if event_state == None:
-            self.get_snapshot(time, visualization_snapshot=True)
-            exit_code = 0
-        else:
-            robot = self.robots[current_event.id]
-            if event_state == RobotState.LOOK:
-                robot.state = RobotState.LOOK
-                robot.look(self.get_snapshot(time), time)
-
-                # Removes robot from simulation
-                if robot.terminated == True:
-                    return 4
-                exit_code = 1
-            elif event_state == RobotState.MOVE:
+        robot = self.robots[current_event.id]
+        if event_state == RobotState.LOOK:
+            robot.state = RobotState.LOOK
+            self._sync_robot(robot, record=False)
+            candidates = self._visible_candidates(robot, time)
+            robot.look(self.get_snapshot(time, ids=candidates), time)
+            self._sync_robot(robot)
+            if self.convergence is not None:
+                self.convergence.looked(robot.id)
+
+            # Removes robot from simulation
+            if robot.terminated == True:
+                return 4
+            exit_code = 1
+        elif event_state == RobotState.MOVE:
+            if profiler is not None:
+                profiler.call("move", robot.move, time)
+            else:
                 robot.move(time)
-                exit_code = 2
-            elif event_state == RobotState.WAIT:
+            self._sync_robot(robot)
+            exit_code = 2
+        elif event_state == RobotState.WAIT:
+            if profiler is not None:
+                profiler.call("wait", robot.wait, time)
+            else:
                 robot.wait(time)
-                exit_code = 3
+            self._sync_robot(robot)
+            if self.convergence is not None:
+                self.convergence.moved()
+            exit_code = 3
 
         self.generate_event(current_event)
         return exit_code
 
+    def stop(self, reason: str) -> None:
+        """
+        Ends the run early by cancelling every pending robot event. Observers
+        still take their last sample before handle_event returns -1.
+        """
+        self.terminate = True
+        self.exit_reason = reason
+        self.event_queue.clear()
+        log_event(
+            self.logger,
+            logging.INFO,
+            self.current_time,
+            None,
+            "STOP",
+            "Simulation stopped: %s",
+            reason,
+        )
+
+    def summary(self) -> dict:
+        return {
+            "num_of_robots": len(self.robots),
+            "algorithm": self.robots[0].algorithm.value if self.robots else None,
+            "terminated_robots": sum(robot.terminated for robot in self.robots),
+            "frozen_robots": sum(robot.frozen for robot in self.robots),
+            "total_distance": sum(robot.travelled_distance for robot in self.robots),
+        }
+
+    def get_state(self) -> dict:
+        """
+        Everything needed to continue the run from this point: the event
+        queue, the observers' next sample times, every robot's mutable fields
+        and the random generator state
+        """
+        return {
+            "current_time": self.current_time,
+            "event_count": self.event_count,
+            "priority_queue": self.event_queue.events(),
+            # None marks an observer that already took its last sample
+            "observers": {
+                **self.event_queue.observer_times(),
+                **dict.fromkeys(self.finished_observers),
+            },
+            "robots": [robot.get_state() for robot in self.robots],
+            "generator": self.generator.bit_generator.state,
+            "random": self.random.get_state(),
+            "exit_reason": self.exit_reason,
+            "convergence": (
+                self.convergence.get_state() if self.convergence is not None else None
+            ),
+            "centroid": (
+                self.centroid.get_state() if self.centroid is not None else None
+            ),
+        }
+
+    def set_state(self, state: dict) -> None:
+        """Restores a state returned by get_state on an identically built Scheduler"""
+        if len(state["robots"]) != len(self.robots):
+            raise ValueError("State was taken from a different number of robots")
+
+        self.current_time = state["current_time"]
+        self.event_count = state["event_count"]
+        self.event_queue = EventQueue(state["priority_queue"])
+        self.generator.bit_generator.state = state["generator"]
+        self.random.set_state(state["random"])
+
+        observers = state["observers"]
+        self.finished_observers = {
+            name for name, time in observers.items() if time is None
+        }
+        for name, observer in list(self.observers.items()):
+            if name not in observers:
+                # Attached after the state was taken
+                observer.next_time = max(observer.next_time, self.current_time)
+                self.event_queue.push_observer(name, observer.next_time)
+            elif observers[name] is None:
+                del self.observers[name]
+            else:
+                observer.next_time = observers[name]
+                self.event_queue.push_observer(name, observer.next_time)
+
+        for robot, robot_state in zip(self.robots, state["robots"]):
+            robot.set_state(robot_state)
+            self._sync_robot(robot, record=False)
+        if self.centroid is not None:
+            self.centroid.set_state(state["centroid"])
+
+        self.exit_reason = state["exit_reason"]
+        self.terminate = self.exit_reason is not None
+        if self.convergence is not None:
+            self.convergence.set_state(state["convergence"])
+
+    def write_checkpoint(self, path: str | None = None) -> None:
+        """
+        Writes the constructor arguments and the current state to `path`
+        (default: checkpoint_path). The file is replaced atomically, so a
+        crash while writing leaves the previous checkpoint intact.
+        """
+        path = path if path is not None else self.checkpoint_path
+        if self.trace is not None:
+            self.trace.flush()
+
+        checkpoint = {
+            "version": CHECKPOINT_VERSION,
+            "parameters": self.parameters,
+            "state": self.get_state(),
+        }
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "wb") as checkpoint_file:
+            pickle.dump(checkpoint, checkpoint_file, protocol=pickle.HIGHEST_PROTOCOL)
+            checkpoint_file.flush()
+            os.fsync(checkpoint_file.fileno())
+        os.replace(temporary_path, path)
+
+        log_event(
+            self.logger,
+            logging.INFO,
+            self.current_time,
+            None,
+            "CHECKPOINT",
+            "Checkpoint written to %s",
+            path,
+        )
+
+    @classmethod
+    def from_checkpoint(
+        cls, path: str, logger: logging.Logger, **overrides
+    ) -> "Scheduler":
+        """
+        Rebuilds a Scheduler from a checkpoint and restores its state. Output
+        files (trace, snapshot spill) are not reopened unless passed again in
+        `overrides`, since that would truncate them.
+        """
+        with open(path, "rb") as checkpoint_file:
+            checkpoint = pickle.load(checkpoint_file)
+        if checkpoint.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version in {path}")
+
+        parameters = {
+            **checkpoint["parameters"],
+            "trace_path": None,
+            "history_path": None,
+            **overrides,
+        }
+        if parameters["history_path"] is None:
+            parameters["history_policy"] = HistoryPolicy.NONE
+
+        scheduler = cls(logger=logger, **parameters)
+        scheduler.set_state(checkpoint["state"])
+        logger.info("Resumed from %s at time %s", path, scheduler.current_time)
+
+        return scheduler
+
+    def close(self) -> None:
+        """Flushes and releases the trace and snapshot history files"""
+        self.snapshot_history.close()
+        if self.profiler is not None:
+            self.profiler.close()
+        if self.trace is not None:
+            self.trace.close()
+
     def initialize_queue(self) -> None:
         # Set the lambda parameter (average rate of occurrences)
         lambda_value = 5  # 5 occurrences per interval
@@ -165,78 +634,21 @@ class Scheduler:
         poisson_numbers = generator.poisson(lambda_value, num_samples)
 
         # Display the generated numbers
-        Scheduler._logger.info(poisson_numbers)
+        self.logger.info(poisson_numbers)
 
     def initialize_queue_exponential(self) -> None:
-        Scheduler._logger.info(f"Seed used: {self.seed}")
+        self.logger.info("Seed used: %s", self.seed)
 
         # Generate time intervals for n events
-        self.generator = np.random.default_rng(seed=self.seed)
         num_of_events = len(self.robots)
-        time_intervals = self.generator.exponential(
-            scale=1 / self.lambda_rate, size=num_of_events
+        time_intervals = self.random.exponentials(
+            1 / self.lambda_rate, num_of_events
         )
-        Scheduler._logger.info(f"Time intervals between events: {time_intervals}")
-
-        initial_event = Event(0.0, -1, None)  # initial event for visualization
-        self.priority_queue: list[Event] = [initial_event]
+        self.logger.info("Time intervals between events: %s", time_intervals)
 
-        for robot in self.robots:
-            time = time_intervals[robot.id]
-            event = Event(time, robot.id, robot.state.next_state())
-            self.priority_queue.append(event)
-
-        heapq.heapify(self.priority_queue)
-
-    def _all_robots_reached(self) -> bool:
-        for robot in self.robots:
-            if robot.frozen == False:
-                return False
-        return True
-
-    # Can be improved when it comes to precision/detection
-    def _detect_multiplicity(self, snapshot: dict[int, SnapshotDetails]):
-        positions = [(v.pos, k) for k, v in snapshot.items()]
-
-        positions.sort()
-
-        i = 0
-        multiplicity = 1
-        while i < len(positions):
-            multiplicity_group = [positions[i][1]]  # Start a new group
-            rounded_coordinates1 = round_coordinates(
-                positions[i][0], self.threshold_precision - 2
-            )
-
-            # Check for close positions
-            for j in range(i + 1, len(positions)):
-                rounded_coordinates2 = round_coordinates(
-                    positions[j][0], self.threshold_precision - 2
-                )
-
-                is_close = all(
-                    abs(rounded_coordinates1[x] - rounded_coordinates2[x])
-                    <= 10**-self.threshold_precision
-                    for x in range(2)
-                )
-
-                if is_close:
-                    multiplicity += 1
-                    multiplicity_group.append(positions[j][1])
-                else:
-                    break
-
-            # Update multiplicity for all robots in the group
-            for robot_id in multiplicity_group:
-                snapshot_details = list(snapshot[robot_id])
-                snapshot_details[4] = multiplicity
-                snapshot[robot_id] = SnapshotDetails(*snapshot_details)
-
-            # Move to the next group
-            i += len(multiplicity_group)
-            multiplicity = 1
-
-
-def round_coordinates(coord: Coordinates, precision: int):
-
-    return Coordinates(round(coord.x, precision), round(coord.y, precision))
+        self.event_queue = EventQueue(
+            [
+                Event(time_intervals[robot.id], robot.id, robot.state.next_state())
+                for robot in self.robots
+            ]
+        )
@@ -0,0 +1,131 @@
+from type_defs import *
+import math
+import numpy as np
+
+
+def smallest_enclosing_circle(
+    points: np.ndarray,
+    threshold_precision: int,
+    generator: np.random.Generator | None = None,
+) -> Circle:
+    """
+    Smallest circle enclosing `points` (an n x 2 array), up to 10^-p.
+
+    Iterative Welzl: the points are visited in random order and whenever one
+    lies outside the current circle, the circle is rebuilt with that point
+    on its boundary from the points before it. Finding the next point
+    outside the circle is a single vectorized pass over the remaining ones,
+    so there is no recursion and no per-point Python work for points inside.
+    Expected O(n).
+    """
+    n = len(points)
+    if n == 0:
+        return Circle(Coordinates(0, 0), 0)
+
+    if generator is not None:
+        points = points[generator.permutation(n)]
+    points = np.ascontiguousarray(points, dtype=np.float64)
+    xs, ys = points[:, 0], points[:, 1]
+    tolerance = 10**-threshold_precision
+
+    def first_outside(start: int, stop: int, circle: tuple) -> int:
+        cx, cy, r = circle
+        distance = np.hypot(xs[start:stop] - cx, ys[start:stop] - cy)
+        outside = np.flatnonzero(distance > r + tolerance)
+        return start + int(outside[0]) if len(outside) else -1
+
+    p = points.tolist()
+    circle = (p[0][0], p[0][1], 0.0)
+    i = first_outside(1, n, circle)
+    while i >= 0:
+        circle = (p[i][0], p[i][1], 0.0)
+        j = first_outside(0, i, circle)
+        while j >= 0:
+            circle = _circle_from_two(p[i], p[j])
+            k = first_outside(0, j, circle)
+            while k >= 0:
+                circle = _circle_from_three(p[i], p[j], p[k])
+                k = first_outside(k + 1, j, circle)
+            j = first_outside(j + 1, i, circle)
+        i = first_outside(i + 1, n, circle)
+
+    cx, cy, r = circle
+    return Circle(Coordinates(cx, cy), r)
+
+
+def encloses(circle: Circle, points: np.ndarray, threshold_precision: int) -> bool:
+    """Whether every point lies within `circle`, up to 10^-p"""
+    distance = np.hypot(
+        points[:, 0] - circle.center[0], points[:, 1] - circle.center[1]
+    )
+    return bool(np.all(distance <= circle.radius + 10**-threshold_precision))
+
+
+def on_circle(circle: Circle, points: np.ndarray, threshold_precision: int) -> np.ndarray:
+    """Indices of the points on the boundary of `circle`, up to 10^-p"""
+    distance = np.hypot(
+        points[:, 0] - circle.center[0], points[:, 1] - circle.center[1]
+    )
+    return np.flatnonzero(np.abs(distance - circle.radius) < 10**-threshold_precision)
+
+
+def circle_support(
+    circle: Circle, ids: np.ndarray, points: np.ndarray, threshold_precision: int
+) -> dict[Id, tuple[float, float]]:
+    """Ids and positions of the points on the boundary of `circle`"""
+    return {
+        int(ids[row]): tuple(points[row].tolist())
+        for row in on_circle(circle, points, threshold_precision)
+    }
+
+
+def still_enclosing(
+    circle: Circle,
+    support: dict[Id, tuple[float, float]] | None,
+    ids: np.ndarray,
+    points: np.ndarray,
+    threshold_precision: int,
+) -> bool:
+    """
+    Whether `circle`, solved when `support` was on its boundary, is still
+    the SEC of `points` (with sorted `ids`): every robot of the support is
+    still there at the same position, and no point lies outside it
+    """
+    if circle is None or not support or len(ids) == 0:
+        return False
+
+    support_ids = list(support.keys())
+    rows = np.minimum(np.searchsorted(ids, support_ids), len(ids) - 1)
+    return (
+        np.array_equal(ids[rows], support_ids)
+        and np.array_equal(points[rows], list(support.values()))
+        and encloses(circle, points, threshold_precision)
+    )
+
+
+def _circle_from_two(a: list[float], b: list[float]) -> tuple[float, float, float]:
+    return (
+        (a[0] + b[0]) / 2.0,
+        (a[1] + b[1]) / 2.0,
+        math.dist(a, b) / 2.0,
+    )
+
+
+def _circle_from_three(
+    a: list[float], b: list[float], c: list[float]
+) -> tuple[float, float, float]:
+    d = 2 * (a[0] * (b[1] - c[1]) + b[0] * (c[1] - a[1]) + c[0] * (a[1] - b[1]))
+    if d == 0:
+        # Collinear: the circle on the two points furthest apart
+        return max(
+            (_circle_from_two(a, b), _circle_from_two(a, c), _circle_from_two(b, c)),
+            key=lambda circle: circle[2],
+        )
+
+    a_sq = a[0] ** 2 + a[1] ** 2
+    b_sq = b[0] ** 2 + b[1] ** 2
+    c_sq = c[0] ** 2 + c[1] ** 2
+    ux = (a_sq * (b[1] - c[1]) + b_sq * (c[1] - a[1]) + c_sq * (a[1] - b[1])) / d
+    uy = (a_sq * (c[0] - b[0]) + b_sq * (a[0] - c[0]) + c_sq * (b[0] - a[0])) / d
+
+    return (ux, uy, math.dist((ux, uy), a))
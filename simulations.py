@@ -0,0 +1,93 @@
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+import itertools
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class Simulation:
+    """A simulation run on behalf of one SocketIO room"""
+
+    def __init__(self, id: int, room: str):
+        self.id = id
+        self.room = room
+        self.cancelled = threading.Event()
+        self.future: Future | None = None
+
+    def cancel(self) -> None:
+        self.cancelled.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    def wait(self) -> None:
+        if self.future is not None and not self.future.cancelled():
+            self.future.exception()
+
+
+class SimulationManager:
+    """
+    Runs simulations concurrently on a worker pool, at most one per room.
+    Starting a simulation only cancels the one already running in the same
+    room; simulations beyond `max_workers` wait for a free worker. A run that
+    raises is logged and handed to `on_error`, which tells its room.
+    """
+
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        on_error: Callable[[Simulation, Exception], None] | None = None,
+    ):
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="simulation"
+        )
+        self.simulations: dict[str, Simulation] = {}
+        self.on_error = on_error
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def start(self, room: str, run: Callable[[Simulation], None]) -> Simulation:
+        """Cancels the room's current simulation and submits `run` for a new one"""
+        self.cancel(room)
+
+        with self._lock:
+            simulation = Simulation(next(self._ids), room)
+            self.simulations[room] = simulation
+            simulation.future = self.executor.submit(self._run, simulation, run)
+
+        return simulation
+
+    def cancel(self, room: str, wait: bool = True) -> Simulation | None:
+        with self._lock:
+            simulation = self.simulations.pop(room, None)
+
+        if simulation is not None:
+            simulation.cancel()
+            if wait:
+                simulation.wait()
+
+        return simulation
+
+    def get(self, room: str) -> Simulation | None:
+        return self.simulations.get(room)
+
+    def shutdown(self) -> None:
+        for room in list(self.simulations):
+            self.cancel(room, wait=False)
+        self.executor.shutdown(wait=True)
+
+    def _run(self, simulation: Simulation, run: Callable[[Simulation], None]) -> None:
+        try:
+            run(simulation)
+        except Exception as error:
+            # The future would keep the exception to itself
+            logger.exception(
+                "Simulation %s in room %s failed", simulation.id, simulation.room
+            )
+            if self.on_error is not None:
+                self.on_error(simulation, error)
+        finally:
+            with self._lock:
+                if self.simulations.get(simulation.room) is simulation:
+                    del self.simulations[simulation.room]
@@ -0,0 +1,352 @@
+from collections import OrderedDict, deque
+from collections.abc import Callable, Iterator, Mapping
+from enums import HistoryPolicy
+from type_defs import *
+from world_state import STATES
+from profiler import Profiler
+import numpy as np
+import math
+import struct
+
+
+class SnapshotView(Mapping):
+    """
+    Read-only snapshot of a set of robots at a given time, backed by arrays
+    copied from the world state. The SnapshotDetails (and the multiplicity
+    they carry) are only built the first time an entry is accessed.
+    """
+
+    def __init__(
+        self,
+        time: float,
+        ids: np.ndarray,
+        positions: np.ndarray,
+        states: np.ndarray,
+        frozen: np.ndarray,
+        terminated: np.ndarray,
+        threshold_precision: int,
+    ):
+        self.time = time
+        self.ids = ids
+        self.positions = positions
+        self.states = states
+        self.frozen = frozen
+        self.terminated = terminated
+        self.threshold_precision = threshold_precision
+        self._convert: Callable[[Coordinates], Coordinates] | None = None
+        self._details: dict[Id, SnapshotDetails] | None = None
+        # Set by the Scheduler while profiling
+        self.profiler: Profiler | None = None
+        # Set by the Scheduler: the cache, and the WorldState.positions_key
+        # the positions were taken at
+        self.multiplicity_cache: MultiplicityCache | None = None
+        self.multiplicity_key: tuple | None = None
+        # Set by the Scheduler: when False every multiplicity is 1
+        self.multiplicity_detection = True
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __iter__(self) -> Iterator[Id]:
+        return iter(self.ids.tolist())
+
+    def __getitem__(self, id: Id) -> SnapshotDetails:
+        return self.materialize()[id]
+
+    def __contains__(self, id: object) -> bool:
+        return id in self.materialize()
+
+    def keys(self):
+        return self.materialize().keys()
+
+    def values(self):
+        return self.materialize().values()
+
+    def items(self):
+        return self.materialize().items()
+
+    def materialize(self) -> dict[Id, SnapshotDetails]:
+        """Builds (once) and returns the snapshot as a dictionary"""
+        if self._details is not None:
+            return self._details
+
+        positions = [Coordinates(*pos) for pos in self.positions.tolist()]
+        if self._convert is not None:
+            positions = [self._convert(pos) for pos in positions]
+
+        if self.profiler is not None and self.multiplicity_detection:
+            multiplicities = self.profiler.call("multiplicity", self._multiplicities)
+        else:
+            multiplicities = self._multiplicities()
+
+        self._details = {
+            id: SnapshotDetails(pos, STATES[state], frozen, terminated, multiplicity)
+            for id, pos, state, frozen, terminated, multiplicity in zip(
+                self.ids.tolist(),
+                positions,
+                self.states.tolist(),
+                self.frozen.tolist(),
+                self.terminated.tolist(),
+                multiplicities,
+            )
+        }
+        return self._details
+
+    def _multiplicities(self) -> list[int]:
+        if not self.multiplicity_detection:
+            return [1] * len(self.ids)
+        if self.multiplicity_cache is None:
+            return detect_multiplicity(self.positions, self.threshold_precision)
+        return self.multiplicity_cache.detect(
+            self.multiplicity_key, self.ids, self.positions, self.threshold_precision
+        )
+
+    def visible_from(
+        self,
+        center: Coordinates,
+        radius: float | None,
+        convert: Callable[[Coordinates], Coordinates] | None = None,
+    ) -> "SnapshotView":
+        """
+        Returns the view restricted to the robots strictly closer than
+        `radius` to `center`. `convert` is applied to positions when the new
+        view is materialized.
+        """
+        if radius is None:
+            # Same robots: share the arrays
+            view = SnapshotView(
+                self.time,
+                self.ids,
+                self.positions,
+                self.states,
+                self.frozen,
+                self.terminated,
+                self.threshold_precision,
+            )
+        else:
+            distance = np.hypot(
+                self.positions[:, 0] - center[0], self.positions[:, 1] - center[1]
+            )
+            mask = radius > distance
+            view = SnapshotView(
+                self.time,
+                self.ids[mask],
+                self.positions[mask],
+                self.states[mask],
+                self.frozen[mask],
+                self.terminated[mask],
+                self.threshold_precision,
+            )
+        view._convert = convert
+        view.profiler = self.profiler
+        view.multiplicity_cache = self.multiplicity_cache
+        view.multiplicity_key = self.multiplicity_key
+        view.multiplicity_detection = self.multiplicity_detection
+
+        return view
+
+
+class MultiplicityCache:
+    """
+    Multiplicities of the last `size` sets of robots they were computed for,
+    while the world has not changed. Entries are keyed by the robots' ids;
+    `key` is `WorldState.positions_key` at the time the positions were
+    taken, which only changes when a robot moves. A new key drops every
+    entry.
+    """
+
+    def __init__(self, size: int = 256):
+        self.size = size
+        self.key: tuple | None = None
+        self.entries: OrderedDict[bytes, list[int]] = OrderedDict()
+        self.hits = 0
+
+    def detect(
+        self,
+        key: tuple,
+        ids: np.ndarray,
+        positions: np.ndarray,
+        threshold_precision: int,
+    ) -> list[int]:
+        if key != self.key:
+            self.key = key
+            self.entries.clear()
+
+        robots = ids.tobytes()
+        multiplicities = self.entries.get(robots)
+        if multiplicities is not None:
+            self.hits += 1
+            self.entries.move_to_end(robots)
+            return multiplicities
+
+        multiplicities = detect_multiplicity(positions, threshold_precision)
+        self.entries[robots] = multiplicities
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+        return multiplicities
+
+
+# Spill file layout: a header, then per snapshot a record header (time,
+# number of robots) followed by the ids, positions, states, frozen and
+# terminated arrays of that snapshot.
+SPILL_MAGIC = b"LCMSNAP1"
+SPILL_HEADER = struct.Struct("<8si")  # magic, threshold precision
+SPILL_RECORD = struct.Struct("<di")  # time, number of robots
+
+
+class SnapshotHistory:
+    """
+    Retention policy for the snapshots taken at LOOK events:
+    NONE keeps nothing, RING keeps the last `size` snapshots in memory and
+    SPILL appends every snapshot to a binary file at `path`.
+    """
+
+    def __init__(
+        self,
+        policy: str | HistoryPolicy = HistoryPolicy.NONE,
+        size: int = 100,
+        path: str | None = None,
+        threshold_precision: int = 5,
+    ):
+        self.policy = HistoryPolicy(policy)
+        self.snapshots: deque[tuple[Time, SnapshotView]] = deque(
+            maxlen=size if self.policy == HistoryPolicy.RING else 0
+        )
+        self.count = 0
+        self._file = None
+
+        if self.policy == HistoryPolicy.SPILL:
+            if path is None:
+                raise ValueError("A path is required to spill snapshots to disk")
+            self._file = open(path, "wb")
+            self._file.write(SPILL_HEADER.pack(SPILL_MAGIC, threshold_precision))
+
+    def __len__(self) -> int:
+        return len(self.snapshots)
+
+    def __iter__(self) -> Iterator[tuple[Time, SnapshotView]]:
+        return iter(self.snapshots)
+
+    def __getitem__(self, i: int) -> tuple[Time, SnapshotView]:
+        return self.snapshots[i]
+
+    def append(self, snapshot: tuple[Time, SnapshotView]) -> None:
+        self.count += 1
+        if self.policy == HistoryPolicy.RING:
+            self.snapshots.append(snapshot)
+        elif self.policy == HistoryPolicy.SPILL:
+            time, view = snapshot
+            self._file.write(SPILL_RECORD.pack(time, len(view)))
+            self._file.write(view.ids.astype(np.int32).tobytes())
+            self._file.write(view.positions.astype(np.float64).tobytes())
+            self._file.write(view.states.astype(np.int8).tobytes())
+            self._file.write(view.frozen.astype(np.bool_).tobytes())
+            self._file.write(view.terminated.astype(np.bool_).tobytes())
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def read_spilled_snapshots(path: str) -> Iterator[tuple[Time, SnapshotView]]:
+    """Yields the snapshots written to `path` by a SPILL history, in order"""
+    with open(path, "rb") as spill_file:
+        magic, threshold_precision = SPILL_HEADER.unpack(
+            spill_file.read(SPILL_HEADER.size)
+        )
+        if magic != SPILL_MAGIC:
+            raise ValueError(f"{path} is not a snapshot spill file")
+
+        while record := spill_file.read(SPILL_RECORD.size):
+            time, n = SPILL_RECORD.unpack(record)
+            ids = np.frombuffer(spill_file.read(4 * n), dtype=np.int32)
+            positions = np.frombuffer(spill_file.read(16 * n), dtype=np.float64)
+            states = np.frombuffer(spill_file.read(n), dtype=np.int8)
+            frozen = np.frombuffer(spill_file.read(n), dtype=np.bool_)
+            terminated = np.frombuffer(spill_file.read(n), dtype=np.bool_)
+            yield time, SnapshotView(
+                time,
+                ids,
+                positions.reshape(n, 2),
+                states,
+                frozen,
+                terminated,
+                threshold_precision,
+            )
+
+
+def detect_multiplicity(positions: np.ndarray, threshold_precision: int) -> list[int]:
+    """
+    Returns the number of robots sharing each position. Positions are
+    taken in (x, y) order; each one not yet grouped becomes the
+    representative of a new group, which takes every ungrouped position
+    within 10^-threshold_precision of it. Groups are therefore never wider
+    than twice the threshold, however many positions lie in a row.
+
+    The threshold is the resolution: the original scheduler compared
+    positions rounded to threshold_precision - 2 decimals instead.
+
+    Positions are bucketed into a grid with cells of 10^-threshold_precision,
+    so only the 3x3 cells around a representative are searched. A cell
+    with no occupied neighbour whose positions all lie within the
+    threshold of its first one is a group on its own.
+    """
+    if len(positions) == 0:
+        return []
+
+    threshold = 10**-threshold_precision
+    # Sorted by x, then y, so that representatives come out in that order
+    order = np.lexsort((positions[:, 1], positions[:, 0]))
+    positions = positions[order]
+    keys = np.floor(positions / threshold).astype(np.int64)
+    cells, first, inverse, counts = np.unique(
+        keys, axis=0, return_index=True, return_inverse=True, return_counts=True
+    )
+    inverse = inverse.reshape(-1)
+
+    # Cells where the first (lowest) position is the representative of all
+    distance = np.linalg.norm(positions - positions[first[inverse]], axis=1)
+    compact = np.ones(len(cells), dtype=bool)
+    np.logical_and.at(compact, inverse, distance <= threshold)
+
+    cell_index = {cell: i for i, cell in enumerate(map(tuple, cells.tolist()))}
+    neighbours = [
+        [
+            j
+            for dx in (-1, 0, 1)
+            for dy in (-1, 0, 1)
+            if (dx or dy) and (j := cell_index.get((x + dx, y + dy))) is not None
+        ]
+        for x, y in cells.tolist()
+    ]
+    alone = compact & np.array([not cell for cell in neighbours])
+
+    group_sizes = counts[inverse]
+    crowded = np.flatnonzero(~alone[inverse]).tolist()
+    if crowded:
+        members: dict[int, list[int]] = {}
+        for i in crowded:
+            members.setdefault(int(inverse[i]), []).append(i)
+
+        points = positions.tolist()
+        grouped: set[int] = set()
+        for i in crowded:
+            if i in grouped:
+                continue
+            x, y = points[i]
+            cell = int(inverse[i])
+            group = [
+                j
+                for near in (cell, *neighbours[cell])
+                for j in members[near]
+                if j not in grouped
+                and math.hypot(points[j][0] - x, points[j][1] - y) <= threshold
+            ]
+            grouped.update(group)
+            group_sizes[group] = len(group)
+
+    multiplicities = np.empty(len(positions), dtype=np.int64)
+    multiplicities[order] = group_sizes
+    return multiplicities.tolist()
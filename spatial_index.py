@@ -0,0 +1,92 @@
+from enums import RobotState
+from type_defs import *
+import math
+
+Cell = tuple[int, int]
+
+
+class SpatialGrid:
+    """
+    Uniform grid over the robots that are not moving, with one cell per
+    `cell_size` square. Robots in MOVE are kept in a separate set since
+    their position changes continuously; callers check them against the
+    interpolated positions instead.
+    """
+
+    def __init__(self, cell_size: float):
+        if cell_size <= 0:
+            raise ValueError("Cell size must be positive")
+
+        self.cell_size = cell_size
+        self.cells: dict[Cell, set[Id]] = {}
+        self.robot_cells: dict[Id, Cell] = {}
+        self.moving: set[Id] = set()
+
+    def _cell(self, coord: Coordinates) -> Cell:
+        return (
+            math.floor(coord[0] / self.cell_size),
+            math.floor(coord[1] / self.cell_size),
+        )
+
+    def _remove_from_cell(self, id: Id) -> None:
+        cell = self.robot_cells.pop(id, None)
+        if cell is None:
+            return
+        members = self.cells[cell]
+        members.discard(id)
+        if not members:
+            del self.cells[cell]
+
+    def update(self, id: Id, state: RobotState, coord: Coordinates) -> None:
+        """Moves a robot to its current cell, or to the moving set while in MOVE"""
+        if state == RobotState.MOVE:
+            self._remove_from_cell(id)
+            self.moving.add(id)
+            return
+
+        self.moving.discard(id)
+        cell = self._cell(coord)
+        if self.robot_cells.get(id) == cell:
+            return
+        self._remove_from_cell(id)
+        self.robot_cells[id] = cell
+        self.cells.setdefault(cell, set()).add(id)
+
+    def query(self, center: Coordinates, radius: float) -> list[Id]:
+        """
+        Ids of the resting robots in every cell overlapping the square of
+        half-width `radius` around `center`. This is a superset of the robots
+        within `radius`; the exact distance check is left to the caller.
+        """
+        min_x, min_y = self._cell((center[0] - radius, center[1] - radius))
+        max_x, max_y = self._cell((center[0] + radius, center[1] + radius))
+        return self._members(min_x, min_y, max_x, max_y)
+
+    def query_cell(self, cell: Cell, radius: float) -> list[Id]:
+        """
+        Ids of the resting robots in every cell within `radius` of `cell`: a
+        superset of the robots within `radius` of any point of the cell, so
+        one query serves every robot in it
+        """
+        reach = math.ceil(radius / self.cell_size)
+        x, y = cell
+        return self._members(x - reach, y - reach, x + reach, y + reach)
+
+    def _members(self, min_x: int, min_y: int, max_x: int, max_y: int) -> list[Id]:
+        """Ids of the robots in the cells from (min_x, min_y) to (max_x, max_y)"""
+        # Fewer occupied cells than cells in range: scan the occupied ones
+        if len(self.cells) < (max_x - min_x + 1) * (max_y - min_y + 1):
+            return [
+                id
+                for (x, y), members in self.cells.items()
+                if min_x <= x <= max_x and min_y <= y <= max_y
+                for id in members
+            ]
+
+        ids = []
+        for x in range(min_x, max_x + 1):
+            for y in range(min_y, max_y + 1):
+                members = self.cells.get((x, y))
+                if members:
+                    ids.extend(members)
+        return ids
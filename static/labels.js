@@ -1,11 +1,15 @@
 const labels = {
   Async: "Async",
-  Sync: "Sync",
+  FSync: "FSync",
+  SSync: "SSync",
   Gathering: "Gathering",
   SEC: "SEC",
   Exponential: "Exponential",
   Random: "Random",
   UserDefined: "User Defined",
+  DropOldest: "Drop Oldest",
+  DropNewest: "Drop Newest",
+  Block: "Block",
   MissingInitialPositionsAlert: "Please click on the screen to provide initial positions",
 };
 
@@ -23,17 +23,26 @@ let simulationId = undefined;
 let sec = [];
 let drawingSimulation = false;
 
+/** Latest details of every robot, frames only carry the ones that changed
+ * @type {Snapshot[1]} */
+let robotDetails = {};
+
+// Same order as RobotState in enums.py
+const robotStates = ["LOOK", "MOVE", "WAIT", "TERMINATED"];
+const FROZEN_FLAG = 1;
+const TERMINATED_FLAG = 2;
+
 //@ts-ignore
 const socket = io(window.location.host);
 
 socket.on("simulation_data", function (data) {
-  const _data = JSON.parse(data);
-  if (simulationId === _data["simulation_id"]) {
+  const frame = typeof data === "string" ? JSON.parse(data) : decodeBinaryFrame(data);
+  if (simulationId === frame["simulation_id"]) {
     startDrawingLoop();
-    snapshotQueue.enqueue(_data["snapshot"]);
+    snapshotQueue.enqueue(applyFrame(frame));
   } else {
     console.log("Received data from mismatched simulation id:");
-    console.log(_data);
+    console.log(frame);
   }
 });
 
@@ -46,6 +55,13 @@ socket.on("simulation_end", function () {
   console.log("Simulation complete.");
 });
 
+socket.on("simulation_error", function (data) {
+  const _data = JSON.parse(data);
+  if (simulationId === _data["simulation_id"]) {
+    console.error(`Simulation ${simulationId} failed: ${_data["error"]}`);
+  }
+});
+
 socket.on("smallest_enclosing_circle", function (data) {
   const _data = JSON.parse(data);
   if (simulationId === _data["simulation_id"]) {
@@ -53,12 +69,25 @@ socket.on("smallest_enclosing_circle", function (data) {
   }
 });
 
-const schedulerTypes = [labels.Async, labels.Sync];
+socket.on("profile_report", function (data) {
+  const _data = JSON.parse(data);
+  if (simulationId !== _data["simulation_id"]) {
+    return;
+  }
+  const profile = _data["profile"];
+  console.log(`Profile of simulation ${simulationId} (${profile["total_time"]} s):`);
+  console.table(profile["phases"]);
+  console.table(profile["events"]);
+});
+
+const schedulerTypes = [labels.Async, labels.FSync, labels.SSync];
 
 const algorithmOptions = [labels.Gathering, labels.SEC];
 
 const probabilityDistributions = [labels.Exponential];
 
+const frameDropPolicies = [labels.DropOldest, labels.DropNewest, labels.Block];
+
 const initialPositionsOptions = [labels.Random, labels.UserDefined];
 
 const startSimulation = {
@@ -111,6 +140,11 @@ const configOptions = {
   random_seed: Math.floor(Math.random() * (2 ** 32 - 1)) + 1,
   width_bound: canvas.width / 4,
   height_bound: canvas.height / 4,
+  stream_fps: 30,
+  binary_frames: false,
+  frame_queue_size: 64,
+  frame_drop_policy: labels.DropOldest,
+  profile: false,
 };
 
 let lastSentConfigOptions = { ...configOptions };
@@ -217,9 +251,16 @@ function setupOptions(configOptions) {
   gui.add(configOptions, "show_visibility");
   gui.add(configOptions, "threshold_precision", 1, 10, 1);
   gui.add(configOptions, "sampling_rate", 0.01, 0.5, 0.01);
+  gui.add(configOptions, "stream_fps", 1, 120, 1).name("Stream FPS");
+  gui.add(configOptions, "binary_frames").name("Binary frames");
+  gui.add(configOptions, "frame_queue_size", 1, 1024, 1).name("Frame queue size");
+  gui
+    .add(configOptions, "frame_drop_policy", frameDropPolicies)
+    .name("Frame drop policy");
   gui.add(configOptions, "labmda_rate");
   gui.add(configOptions, "algorithm", algorithmOptions).name("Algorithm");
   gui.add(configOptions, "random_seed", 1, 2 ** 32 - 1, 1).name("Seed");
+  gui.add(configOptions, "profile").name("Profile (console)");
   const startSimulationBtn = gui
     .add(startSimulation, "start_simulation")
     .name("Start simulation");
@@ -379,6 +420,56 @@ function drawSnapshot(snapshot) {
   }
 }
 
+/**
+ * Applies a delta frame to the latest robot details
+ * @param {Frame} frame
+ * @returns {Snapshot} Full snapshot after the frame
+ */
+function applyFrame(frame) {
+  if (frame.keyframe) {
+    robotDetails = {};
+  }
+  Object.assign(robotDetails, frame.robots);
+
+  return [frame.time, { ...robotDetails }];
+}
+
+/**
+ * Decodes a binary frame, see FRAME_HEADER in streaming.py for the layout
+ * @param {ArrayBuffer} buffer
+ * @returns {Frame}
+ */
+function decodeBinaryFrame(buffer) {
+  const header = new DataView(buffer, 0, 24);
+  const n = header.getUint32(12, true);
+
+  const x = new Float64Array(buffer, 24, n);
+  const y = new Float64Array(buffer, 24 + 8 * n, n);
+  const ids = new Uint32Array(buffer, 24 + 16 * n, n);
+  const multiplicity = new Uint32Array(buffer, 24 + 20 * n, n);
+  const states = new Uint8Array(buffer, 24 + 24 * n, n);
+  const flags = new Uint8Array(buffer, 24 + 25 * n, n);
+
+  /** @type {Snapshot[1]} */
+  const robots = {};
+  for (let i = 0; i < n; i++) {
+    robots[ids[i]] = [
+      [x[i], y[i]],
+      robotStates[states[i]],
+      (flags[i] & FROZEN_FLAG) !== 0,
+      (flags[i] & TERMINATED_FLAG) !== 0,
+      multiplicity[i],
+    ];
+  }
+
+  return {
+    time: header.getFloat64(0, true),
+    simulation_id: header.getUint32(8, true),
+    keyframe: header.getUint8(16) === 1,
+    robots,
+  };
+}
+
 function updateTimeElement(t) {
   time.innerText = t;
 }
@@ -429,6 +520,7 @@ function clearSimulation() {
   gui.updatePauseText();
   sec = [];
   drawingSimulation = false;
+  robotDetails = {};
 }
 
 /**
@@ -3,6 +3,13 @@ type Snapshot = [
   Record<string, [Coordinates, State, FrozenState, TerminatedState, Multiplicity]>
 ];
 
+type Frame = {
+  simulation_id: number;
+  time: number;
+  keyframe: boolean;
+  robots: Snapshot[1];
+};
+
 type RobotMap = Record<string, Robot>;
 
 type Coordinates = [number, number];
@@ -0,0 +1,231 @@
+from enums import FrameDropPolicy
+from type_defs import *
+from world_state import STATE_CODES, FROZEN_FLAG, TERMINATED_FLAG
+from collections import deque
+from collections.abc import Callable
+import json
+import logging
+import struct
+import threading
+import time as wall_clock
+
+logger = logging.getLogger(__name__)
+
+# Binary frame layout (little endian), laid out so every column can be read
+# as a typed array in the browser without copying:
+#   header        FRAME_HEADER (time, simulation id, robot count, keyframe)
+#   x, y          float64 column per coordinate
+#   ids           uint32 column
+#   multiplicity  uint32 column
+#   states        uint8 column, index into RobotState
+#   flags         uint8 column, FROZEN_FLAG | TERMINATED_FLAG
+FRAME_HEADER = struct.Struct("<dIIB7x")
+
+
+class FrameEncoder:
+    """
+    Encodes visualization snapshots as deltas: only robots whose position,
+    state, flags or multiplicity differ from the last encoded frame are
+    included. The first frame is a keyframe with every robot.
+    """
+
+    def __init__(self, simulation_id: int, binary: bool = False):
+        self.simulation_id = simulation_id
+        self.binary = binary
+        self.last_sent: dict[Id, SnapshotDetails] = {}
+
+    def encode(self, time: float, snapshot: dict[Id, SnapshotDetails]) -> str | bytes:
+        keyframe = not self.last_sent
+        changed = {
+            id: details
+            for id, details in snapshot.items()
+            if self.last_sent.get(id) != details
+        }
+        self.last_sent.update(changed)
+
+        if self.binary:
+            return self._encode_binary(time, changed, keyframe)
+
+        return json.dumps(
+            {
+                "simulation_id": self.simulation_id,
+                "time": time,
+                "keyframe": keyframe,
+                "robots": changed,
+            }
+        )
+
+    def _encode_binary(
+        self, time: float, robots: dict[Id, SnapshotDetails], keyframe: bool
+    ) -> bytes:
+        n = len(robots)
+        details = robots.values()
+        return b"".join(
+            (
+                FRAME_HEADER.pack(time, self.simulation_id, n, keyframe),
+                struct.pack(f"<{n}d", *(d.pos[0] for d in details)),
+                struct.pack(f"<{n}d", *(d.pos[1] for d in details)),
+                struct.pack(f"<{n}I", *robots.keys()),
+                struct.pack(f"<{n}I", *(d.multiplicity for d in details)),
+                bytes(STATE_CODES[d.state] for d in details),
+                bytes(
+                    FROZEN_FLAG * d.frozen | TERMINATED_FLAG * d.terminated
+                    for d in details
+                ),
+            )
+        )
+
+
+class FrameStream:
+    """
+    Coalesces visualization frames to at most `fps` per wall-clock second.
+    Frames arriving faster are held back and only the most recent one is
+    encoded when the next slot opens, so skipped frames cost nothing to send.
+    """
+
+    def __init__(self, simulation_id: int, fps: float = 30, binary: bool = False):
+        self.encoder = FrameEncoder(simulation_id, binary)
+        self.interval = 1 / fps if fps else 0.0
+        self.last_emit = float("-inf")
+        self.pending: tuple[float, dict[Id, SnapshotDetails]] | None = None
+
+    def push(
+        self, time: float, snapshot: dict[Id, SnapshotDetails]
+    ) -> str | bytes | None:
+        """Returns a payload to emit now, or None if the frame was coalesced"""
+        self.pending = (time, snapshot)
+        now = wall_clock.monotonic()
+        if now - self.last_emit < self.interval:
+            return None
+
+        self.last_emit = now
+        return self.flush()
+
+    def flush(self) -> str | bytes | None:
+        """Encodes the frame held back by push, if any"""
+        if self.pending is None:
+            return None
+
+        time, snapshot = self.pending
+        self.pending = None
+        return self.encoder.encode(time, snapshot)
+
+
+class FrameQueue:
+    """
+    Bounded queue between the simulation and the emitter. When full, put()
+    evicts the oldest frame (DROP_OLDEST), discards the new one
+    (DROP_NEWEST) or waits for room (BLOCK). Once closed, put() discards
+    every frame, waking up any put() waiting for room.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 64,
+        policy: str | FrameDropPolicy = FrameDropPolicy.DROP_OLDEST,
+    ):
+        self.maxsize = maxsize
+        self.policy = FrameDropPolicy(policy)
+        self.frames: deque = deque()
+        self.dropped = 0
+        self.closed = False
+        self._condition = threading.Condition()
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def put(self, frame) -> bool:
+        """Returns False if a frame had to be dropped"""
+        with self._condition:
+            dropped = False
+            if len(self.frames) >= self.maxsize:
+                if self.policy == FrameDropPolicy.DROP_NEWEST:
+                    self.dropped += 1
+                    return False
+                elif self.policy == FrameDropPolicy.DROP_OLDEST:
+                    self.frames.popleft()
+                    self.dropped += 1
+                    dropped = True
+                else:
+                    self._condition.wait_for(
+                        lambda: len(self.frames) < self.maxsize or self.closed
+                    )
+
+            if self.closed:
+                # The emitter may already be gone
+                self.dropped += 1
+                return False
+
+            self.frames.append(frame)
+            self._condition.notify_all()
+            return not dropped
+
+    def get(self):
+        """Waits for the next frame. Returns None once closed and drained."""
+        with self._condition:
+            self._condition.wait_for(lambda: self.frames or self.closed)
+            if not self.frames:
+                return None
+            frame = self.frames.popleft()
+            self._condition.notify_all()
+            return frame
+
+    def close(self) -> None:
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+
+
+class FrameEmitter:
+    """
+    Drains a FrameQueue on its own thread, encodes the frames through a
+    FrameStream and hands the payloads to `emit`. The simulation only pays
+    for putting frames on the queue, however slow the client is. If `emit`
+    raises, the emitter stops, closes the queue so put() no longer waits,
+    and keeps the exception in `error` for close() to raise.
+    """
+
+    def __init__(
+        self,
+        emit: Callable[[str | bytes], None],
+        stream: FrameStream,
+        maxsize: int = 64,
+        policy: str | FrameDropPolicy = FrameDropPolicy.DROP_OLDEST,
+    ):
+        self.emit = emit
+        self.stream = stream
+        self.queue = FrameQueue(maxsize, policy)
+        self.error: Exception | None = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def put(self, time: float, snapshot: dict[Id, SnapshotDetails]) -> bool:
+        return self.queue.put((time, snapshot))
+
+    def close(self) -> None:
+        """
+        Emits the remaining frames and waits for the emitter thread. Raises
+        the exception that stopped the emitter, the first time only.
+        """
+        self.queue.close()
+        self._thread.join()
+        error, self.error = self.error, None
+        if error is not None:
+            raise error
+
+    def _run(self) -> None:
+        try:
+            while (frame := self.queue.get()) is not None:
+                payload = self.stream.push(*frame)
+                if payload is not None:
+                    self.emit(payload)
+
+            # Last frame held back by the frame rate limit
+            payload = self.stream.flush()
+            if payload is not None:
+                self.emit(payload)
+        except Exception as error:
+            logger.exception("Emitting visualization frames failed")
+            self.error = error
+            # A full BLOCK queue would otherwise hold up the simulation forever
+            self.queue.close()
@@ -0,0 +1,187 @@
+import argparse
+import csv
+import itertools
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from headless import build_scheduler, load_config, null_logger, run_scheduler
+from event_log import setup_event_logger, close_event_logger
+from profiler import PHASES
+
+SWEEP_PARAMETERS = [
+    "scheduler_type",
+    "algorithm",
+    "num_of_robots",
+    "labmda_rate",
+    "visibility_radius",
+    "rigid_movement",
+]
+
+RESULT_COLUMNS = [
+    "run_id",
+    *SWEEP_PARAMETERS,
+    "seed",
+    "exit_reason",
+    "events",
+    "look_events",
+    "move_events",
+    "wait_events",
+    "simulated_time",
+    "wall_time",
+    "events_per_sec",
+    "terminated_robots",
+    "frozen_robots",
+    "total_distance",
+    # Seconds spent per phase, only filled for runs with "profile": true
+    *(f"profile_{phase}" for phase in PHASES),
+    "error",
+]
+
+
+def expand_grid(
+    base_config: dict, grid: dict[str, list], seeds: list[int]
+) -> list[tuple[dict, int]]:
+    """Returns one (config, seed) pair per point of the grid and seed"""
+    keys = list(grid.keys())
+    runs = []
+    for values in itertools.product(*(grid[key] for key in keys)):
+        config = {**base_config, **dict(zip(keys, values))}
+        # The grid decides the number of robots, not the base positions
+        if "num_of_robots" in grid or "number_of_robots" in grid:
+            config["initial_positions"] = []
+        for seed in seeds:
+            runs.append((config, seed))
+
+    return runs
+
+
+def _run_logger(run_id: int, log_dir: str | None) -> logging.Logger:
+    if log_dir is None:
+        return null_logger(f"sweep_{run_id}")
+
+    return setup_event_logger(
+        f"sweep_{run_id}", os.path.join(log_dir, f"run_{run_id}.txt")
+    )
+
+
+def run_single(
+    run_id: int,
+    config: dict,
+    seed: int,
+    max_events: int | None = None,
+    max_time: float | None = None,
+    log_dir: str | None = None,
+) -> dict:
+    """Worker entry point. Every run owns its logger and random generator."""
+    logger = _run_logger(run_id, log_dir)
+    try:
+        scheduler = build_scheduler(config, seed=seed, logger=logger)
+        try:
+            metrics = run_scheduler(
+                scheduler, max_events=max_events, max_time=max_time
+            )
+        finally:
+            scheduler.close()
+    finally:
+        close_event_logger(logger)
+
+    return metrics
+
+
+def _result_row(run_id: int, config: dict, seed: int, metrics: dict) -> dict:
+    row = {key: config.get(key) for key in SWEEP_PARAMETERS}
+    if row["num_of_robots"] is None:
+        row["num_of_robots"] = config.get("number_of_robots")
+    profile = metrics.pop("profile", None)
+    row.update(metrics)
+    if profile is not None:
+        for phase, totals in profile["phases"].items():
+            row[f"profile_{phase}"] = totals["time"]
+    row["run_id"] = run_id
+    row["seed"] = seed
+
+    return row
+
+
+def run_sweep(
+    base_config: dict,
+    grid: dict[str, list],
+    seeds: list[int],
+    output: str,
+    max_workers: int | None = None,
+    max_events: int | None = None,
+    max_time: float | None = None,
+    log_dir: str | None = None,
+) -> int:
+    """
+    Runs every combination of `grid` and `seeds` on a process pool and appends
+    one row per run to the CSV file at `output` as soon as the run finishes.
+    Returns the number of failed runs.
+    """
+    runs = expand_grid(base_config, grid, seeds)
+    if log_dir is not None:
+        os.makedirs(log_dir, exist_ok=True)
+
+    failures = 0
+    with open(output, "w", newline="") as results_file, ProcessPoolExecutor(
+        max_workers=max_workers
+    ) as executor:
+        writer = csv.DictWriter(results_file, fieldnames=RESULT_COLUMNS)
+        writer.writeheader()
+
+        futures = {
+            executor.submit(
+                run_single, run_id, config, seed, max_events, max_time, log_dir
+            ): run_id
+            for run_id, (config, seed) in enumerate(runs)
+        }
+
+        for future in as_completed(futures):
+            run_id = futures[future]
+            config, seed = runs[run_id]
+            try:
+                metrics = future.result()
+            except Exception as e:
+                failures += 1
+                metrics = {"exit_reason": "error", "error": repr(e)}
+
+            writer.writerow(_result_row(run_id, config, seed, metrics))
+            results_file.flush()
+
+    return failures
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Run a parameter sweep")
+    parser.add_argument("--config", default="config.json", help="base configuration")
+    parser.add_argument(
+        "--grid",
+        required=True,
+        help='JSON file mapping parameters to values, e.g. {"num_of_robots": [10, 20]}',
+    )
+    parser.add_argument("--seeds", type=int, nargs="+", required=True)
+    parser.add_argument("--output", default="results.csv")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-events", type=int, default=None)
+    parser.add_argument("--max-time", type=float, default=None)
+    parser.add_argument("--log-dir", default=None, help="write one log per run here")
+    args = parser.parse_args(argv)
+
+    failures = run_sweep(
+        load_config(args.config),
+        load_config(args.grid),
+        args.seeds,
+        args.output,
+        max_workers=args.workers,
+        max_events=args.max_events,
+        max_time=args.max_time,
+        log_dir=args.log_dir,
+    )
+    if failures:
+        print(f"{failures} run(s) failed, see the error column of {args.output}")
+
+    return failures
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,388 @@
+from enums import *
+from type_defs import *
+from sec import smallest_enclosing_circle, on_circle, circle_support, still_enclosing
+from snapshot import SnapshotView
+from spatial_index import SpatialGrid
+from world_state import STATE_CODES
+from event_log import log_event
+from collections import deque
+import numpy as np
+import logging
+
+# Rows of the robot x robot visibility matrix computed at once
+VISIBILITY_BLOCK = 1024
+
+
+class SyncScheduler:
+    """
+    Round-based scheduler for the FSYNC and SSYNC models. In every round the
+    activated robots (all of them in FSYNC, a random non-empty subset in
+    SSYNC) look at the same snapshot, compute their destinations and move
+    together. Destinations are computed as array operations over all the
+    activated robots, except for SEC with limited visibility: robots look
+    up their neighbours in a SpatialGrid one cell at a time, and every
+    distinct set of visible robots gets its own circle, reused while it
+    still fits. A round takes one unit of simulated time. There
+    is no event queue and no Robot object.
+    """
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        seed: int,
+        num_of_robots: int,
+        initial_positions: list[list[float]],
+        algorithm: str = Algorithm.GATHERING,
+        scheduler_type: str = SchedulerType.FSYNC,
+        visibility_radius: float | None = None,
+        rigid_movement: bool = True,
+        threshold_precision: int = 5,
+        activation_probability: float = 0.5,
+        visualization: bool = True,
+    ):
+        self.logger = logger
+        self.seed = seed
+        self.generator = np.random.default_rng(seed=seed)
+        self.algorithm = Algorithm(algorithm)
+        self.scheduler_type = SchedulerType(scheduler_type)
+        if self.scheduler_type == SchedulerType.ASYNC:
+            raise ValueError("Use Scheduler for the asynchronous model")
+        if visibility_radius is not None and visibility_radius <= 0:
+            # Robots see strictly closer than the radius, so not even themselves
+            raise ValueError("visibility_radius must be positive, or None")
+        self.visibility_radius = visibility_radius
+        self.rigid_movement = rigid_movement
+        self.threshold_precision = threshold_precision
+        self.activation_probability = activation_probability
+        self.visualization = visualization
+        self.visualization_snapshots: deque[tuple[Time, dict[Id, SnapshotDetails]]]
+        self.visualization_snapshots = deque(maxlen=1)
+        self.current_time = 0.0
+        self.event_count = 0
+        self.exit_reason: str | None = None
+
+        n = num_of_robots
+        self.positions = np.array(initial_positions[:n], dtype=np.float64).reshape(n, 2)
+        self.frozen = np.zeros(n, dtype=bool)
+        self.terminated = np.zeros(n, dtype=bool)
+        self.travelled_distance = np.zeros(n)
+        # Robots that found nothing to do since the last movement
+        self.settled = np.zeros(n, dtype=bool)
+        self.secs: list[Circle | None] = [None] * n
+        # Robots on the boundary of each robot's last SEC, see Robot.sec_support
+        self.sec_supports: list[dict[Id, tuple[float, float]] | None] = [None] * n
+        # Circle, support and terminal flag of each set of visible robots
+        # last round, keyed by their ids
+        self.neighbourhood_secs: dict[bytes, tuple[Circle, dict, bool]] = {}
+
+        # SEC with limited visibility looks up each robot's neighbours
+        self.spatial_index: SpatialGrid | None = None
+        if self.algorithm == Algorithm.SEC and visibility_radius is not None:
+            self._index_positions(np.arange(n))
+
+        self.logger.info("Seed used: %s", self.seed)
+        if self.visualization:
+            self._record_frame()
+
+    def handle_event(self) -> int:
+        """
+        Runs one round. Returns 0 if the round recorded a visualization
+        frame, 1 otherwise, and -1 once no robot can move anymore.
+        """
+        if self.exit_reason is not None:
+            return -1
+
+        ids = self._activate()
+        if len(ids) == 0:
+            self.exit_reason = "completed"
+            return -1
+
+        snapshot = self.positions.copy()
+        targets, terminal = self._compute(snapshot, ids)
+
+        delta = targets - snapshot[ids]
+        distance = np.hypot(delta[:, 0], delta[:, 1])
+        frozen = distance < 10**-self.threshold_precision
+        moving = ~frozen & ~terminal
+        if not self.rigid_movement:
+            fraction = 1 - self.generator.random(len(ids))  # range is (0, 1]
+            delta *= fraction[:, None]
+            distance *= fraction
+
+        moved = ids[moving]
+        self.positions[moved] += delta[moving]
+        if self.spatial_index is not None:
+            self._index_positions(moved)
+        self.travelled_distance[moved] += distance[moving]
+        self.frozen[ids] = frozen | terminal
+        self.terminated[ids] |= terminal
+
+        if len(moved) > 0:
+            self.settled[:] = False
+        self.settled[ids[frozen & ~terminal]] = True
+
+        self.current_time += 1
+        self.event_count += 1
+        log_event(
+            self.logger,
+            logging.INFO,
+            self.current_time,
+            None,
+            "ROUND",
+            "ROUND   -- Activated: %s | Moved: %s | Terminated: %s",
+            len(ids),
+            len(moved),
+            int(self.terminated.sum()),
+        )
+
+        if self.terminated.all():
+            self.exit_reason = "completed"
+        elif (self.settled | self.terminated).all():
+            self.exit_reason = "settled"
+
+        if self.visualization:
+            self._record_frame()
+            return 0
+
+        return 1
+
+    def _activate(self) -> np.ndarray:
+        """Ids of the robots activated this round"""
+        active = np.flatnonzero(~self.terminated)
+        if self.scheduler_type == SchedulerType.FSYNC or len(active) == 0:
+            return active
+
+        chosen = self.generator.random(len(active)) < self.activation_probability
+        if not chosen.any():
+            chosen[self.generator.integers(len(active))] = True
+
+        return active[chosen]
+
+    def _compute(
+        self, snapshot: np.ndarray, ids: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Destinations of the robots in `ids` and whether each one terminates"""
+        if self.algorithm == Algorithm.GATHERING:
+            if self.visibility_radius is None:
+                return self._gathering_global(snapshot, ids)
+            return self._gathering_visible(snapshot, ids)
+
+        return self._sec(snapshot, ids)
+
+    def _gathering_global(
+        self, snapshot: np.ndarray, ids: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        centroid = snapshot.mean(axis=0)
+        spread = np.hypot(*(snapshot - centroid).T).max()
+        terminal = spread <= 10**-self.threshold_precision or len(snapshot) == 1
+
+        return (
+            np.broadcast_to(centroid, (len(ids), 2)).copy(),
+            np.full(len(ids), terminal),
+        )
+
+    def _gathering_visible(
+        self, snapshot: np.ndarray, ids: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        targets = np.empty((len(ids), 2))
+        terminal = np.empty(len(ids), dtype=bool)
+        for start in range(0, len(ids), VISIBILITY_BLOCK):
+            block = ids[start : start + VISIBILITY_BLOCK]
+            visible = self._visible(snapshot, block)
+            counts = visible.sum(axis=1)
+            centroids = (visible @ snapshot) / counts[:, None]
+            spread = np.hypot(
+                snapshot[None, :, 0] - centroids[:, None, 0],
+                snapshot[None, :, 1] - centroids[:, None, 1],
+            )
+            spread = np.where(visible, spread, 0).max(axis=1)
+
+            targets[start : start + len(block)] = centroids
+            terminal[start : start + len(block)] = (
+                spread <= 10**-self.threshold_precision
+            ) | (counts == 1)
+
+        return targets, terminal
+
+    def _sec(
+        self, snapshot: np.ndarray, ids: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        if self.visibility_radius is not None:
+            return self._sec_visible(snapshot, ids)
+
+        circle = smallest_enclosing_circle(
+            snapshot, self.threshold_precision, self.generator
+        )
+        everyone_on_circle = len(
+            on_circle(circle, snapshot, self.threshold_precision)
+        ) == len(snapshot)
+        for id in ids.tolist():
+            self.secs[id] = circle
+
+        return (
+            self._closest_on_circle(circle, snapshot[ids]),
+            np.full(len(ids), everyone_on_circle or len(snapshot) == 1),
+        )
+
+    def _sec_visible(
+        self, snapshot: np.ndarray, ids: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        SEC of what each robot sees. Robots are grouped by grid cell and each
+        group is checked against the candidates of one query at once. Robots
+        that see the same robots share one circle: it is solved once per
+        round, and reused from the previous round while it still fits.
+        """
+        radius = self.visibility_radius
+        threshold_precision = self.threshold_precision
+        centers = np.empty((len(ids), 2))
+        radii = np.empty(len(ids))
+        terminal = np.empty(len(ids), dtype=bool)
+
+        cells: dict[tuple[int, int], list[int]] = {}
+        robot_cells = self.spatial_index.robot_cells
+        for row, id in enumerate(ids.tolist()):
+            cells.setdefault(robot_cells[id], []).append(row)
+
+        previous = self.neighbourhood_secs
+        self.neighbourhood_secs = {}
+        for cell, rows in cells.items():
+            candidates = np.array(
+                self.spatial_index.query_cell(cell, radius), dtype=np.intp
+            )
+            candidates.sort()
+            members = ids[rows]
+            distance = np.hypot(
+                snapshot[candidates, 0] - snapshot[members, None, 0],
+                snapshot[candidates, 1] - snapshot[members, None, 1],
+            )
+            for row, id, mask in zip(rows, members.tolist(), radius > distance):
+                visible = candidates[mask]
+                neighbourhood = visible.tobytes()
+                shared = self.neighbourhood_secs.get(neighbourhood)
+                if shared is None:
+                    points = snapshot[visible]
+                    # Solved again only when neither the robot's previous
+                    # circle nor the one of the same robots last round fits
+                    for circle, support in (
+                        (self.secs[id], self.sec_supports[id]),
+                        previous.get(neighbourhood, (None, None))[:2],
+                    ):
+                        if still_enclosing(
+                            circle, support, visible, points, threshold_precision
+                        ):
+                            break
+                    else:
+                        circle = smallest_enclosing_circle(
+                            points, threshold_precision, self.generator
+                        )
+                        support = circle_support(
+                            circle, visible, points, threshold_precision
+                        )
+                    shared = (
+                        circle,
+                        support,
+                        len(points) == 1
+                        or len(on_circle(circle, points, threshold_precision))
+                        == len(points),
+                    )
+                    self.neighbourhood_secs[neighbourhood] = shared
+
+                circle, self.sec_supports[id], terminal[row] = shared
+                self.secs[id] = circle
+                centers[row] = circle.center
+                radii[row] = circle.radius
+
+        return self._project(centers, radii, snapshot[ids]), terminal
+
+    def _index_positions(self, ids: np.ndarray) -> None:
+        if self.spatial_index is None:
+            self.spatial_index = SpatialGrid(self.visibility_radius)
+        for id, position in zip(ids.tolist(), self.positions[ids].tolist()):
+            self.spatial_index.update(id, RobotState.WAIT, position)
+
+    def _visible(self, snapshot: np.ndarray, block: np.ndarray) -> np.ndarray:
+        """block x n mask of the robots each robot in `block` can see"""
+        distance = np.hypot(
+            snapshot[None, :, 0] - snapshot[block, None, 0],
+            snapshot[None, :, 1] - snapshot[block, None, 1],
+        )
+        return self.visibility_radius > distance
+
+    def _closest_on_circle(self, circle: Circle, points: np.ndarray) -> np.ndarray:
+        """Projection of each point onto the circle; the center stays put"""
+        return self._project(
+            np.array(circle.center, dtype=np.float64), circle.radius, points
+        )
+
+    def _project(
+        self, centers: np.ndarray, radii: np.ndarray | float, points: np.ndarray
+    ) -> np.ndarray:
+        """Projection of each point onto its circle; a center stays put"""
+        offset = points - centers
+        distance = np.hypot(offset[:, 0], offset[:, 1])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scale = radii / distance
+        projected = centers + offset * scale[:, None]
+
+        return np.where((distance > 0)[:, None], projected, points)
+
+    def _record_frame(self) -> None:
+        n = len(self.positions)
+        snapshot = SnapshotView(
+            self.current_time,
+            np.arange(n),
+            self.positions.copy(),
+            np.full(n, STATE_CODES[RobotState.WAIT], dtype=np.int8),
+            self.frozen.copy(),
+            self.terminated.copy(),
+            self.threshold_precision,
+        )
+        self.visualization_snapshots.append((self.current_time, snapshot.materialize()))
+
+    def summary(self) -> dict:
+        return {
+            "num_of_robots": len(self.positions),
+            "algorithm": self.algorithm.value,
+            "terminated_robots": int(self.terminated.sum()),
+            "frozen_robots": int(self.frozen.sum()),
+            "total_distance": float(self.travelled_distance.sum()),
+        }
+
+    def get_state(self) -> dict:
+        return {
+            "current_time": self.current_time,
+            "event_count": self.event_count,
+            "exit_reason": self.exit_reason,
+            "positions": self.positions.copy(),
+            "frozen": self.frozen.copy(),
+            "terminated": self.terminated.copy(),
+            "travelled_distance": self.travelled_distance.copy(),
+            "settled": self.settled.copy(),
+            "generator": self.generator.bit_generator.state,
+            "secs": list(self.secs),
+            "sec_supports": list(self.sec_supports),
+            "neighbourhood_secs": dict(self.neighbourhood_secs),
+        }
+
+    def set_state(self, state: dict) -> None:
+        self.current_time = state["current_time"]
+        self.event_count = state["event_count"]
+        self.exit_reason = state["exit_reason"]
+        self.positions = state["positions"].copy()
+        self.frozen = state["frozen"].copy()
+        self.terminated = state["terminated"].copy()
+        self.travelled_distance = state["travelled_distance"].copy()
+        self.settled = state["settled"].copy()
+        self.generator.bit_generator.state = state["generator"]
+        n = len(self.positions)
+        self.secs = list(state["secs"])
+        self.sec_supports = list(state["sec_supports"])
+        self.neighbourhood_secs = dict(state["neighbourhood_secs"])
+        if self.spatial_index is not None:
+            self.spatial_index = None
+            self._index_positions(np.arange(n))
+
+    def close(self) -> None:
+        pass
+
@@ -0,0 +1,119 @@
+import math
+import numpy as np
+from centroid import CentroidTracker
+from enums import RobotState
+from world_state import MOVE_CODE, STATE_CODES, WorldState
+
+THRESHOLD_PRECISION = 5
+N = 20
+
+
+def _set(world, id, state, frozen=False, terminated=False):
+    world.states[id] = STATE_CODES[state]
+    world.frozen[id] = frozen
+    world.terminated[id] = terminated
+    # The Scheduler's WorldState.update bumps it on every such change
+    world.version += 1
+
+
+def _step(world, generator, id, time):
+    """Moves, stops, freezes or terminates one robot at `time`"""
+    if world.states[id] == MOVE_CODE:
+        world.positions[id] = world.positions_at(time)[id]
+        _set(world, id, RobotState.WAIT)
+    elif world.terminated[id]:
+        pass
+    elif generator.random() < 0.6:
+        world.start_positions[id] = world.positions[id]
+        # Far enough that no robot arrives before the test ends
+        angle = generator.uniform(0, 2 * math.pi)
+        world.targets[id] = world.positions[id] + 500 * np.array(
+            [math.cos(angle), math.sin(angle)]
+        )
+        world.start_times[id] = time
+        _set(world, id, RobotState.MOVE)
+    elif generator.random() < 0.8:
+        _set(world, id, RobotState.WAIT, frozen=True)
+    else:
+        _set(world, id, RobotState.TERMINATED, frozen=True, terminated=True)
+
+
+def _world(generator):
+    positions = generator.uniform(-50, 50, (N, 2))
+    speeds = generator.uniform(0.5, 2, N).tolist()
+    return WorldState(positions, speeds, THRESHOLD_PRECISION)
+
+
+def _box(points):
+    if len(points) == 0:
+        return None
+    return (*points.min(axis=0).tolist(), *points.max(axis=0).tolist())
+
+
+def test_centroid_matches_the_mean_position():
+    generator = np.random.default_rng(3)
+    world = _world(generator)
+    tracker = CentroidTracker(world)
+    time = 0.0
+    for _ in range(10 * N + 7):
+        time += generator.uniform(0, 0.2)
+        id = int(generator.integers(N))
+        _step(world, generator, id, time)
+        tracker.update(id)
+
+        for t in (time, time + 0.1):
+            centroid = tracker.centroid(t)
+            expected = world.positions_at(t).mean(axis=0)
+            assert math.isclose(centroid.x, expected[0], abs_tol=1e-9)
+            assert math.isclose(centroid.y, expected[1], abs_tol=1e-9)
+
+
+def test_sums_are_recomputed_every_n_updates():
+    generator = np.random.default_rng(4)
+    world = _world(generator)
+    tracker = CentroidTracker(world)
+    time = 0.0
+    for _ in range(3 * N):
+        time += generator.uniform(0, 0.2)
+        id = int(generator.integers(N))
+        _step(world, generator, id, time)
+        tracker.update(id)
+
+    # Refreshed by the last update: exactly the sums of a new tracker
+    assert tracker.get_state() == CentroidTracker(world).get_state()
+
+    tracker.update(0)
+    assert tracker.get_state()["updates"] == 1
+
+
+def test_within_agrees_with_every_robot_when_it_decides():
+    generator = np.random.default_rng(5)
+    world = _world(generator)
+    tracker = CentroidTracker(world)
+    time = 0.0
+    results = set()
+    for _ in range(5 * N):
+        time += generator.uniform(0, 0.2)
+        id = int(generator.integers(N))
+        _step(world, generator, id, time)
+        tracker.update(id)
+
+        positions = world.positions_at(time)
+        moving = world.states == MOVE_CODE
+        resting = positions[~moving]
+        paths = np.concatenate([world.start_positions[moving], world.targets[moving]])
+        assert tracker.resting.bounds() == _box(resting)
+        assert tracker.paths.bounds() == _box(paths)
+        paths = np.concatenate([resting, paths])
+        for tolerance in (1.0, 80.0, 1000.0):
+            coord = tracker.centroid(time)
+            within = tracker.within(coord, tolerance)
+            results.add(within)
+            distances = np.hypot(*(positions - [coord.x, coord.y]).T)
+            path_distances = np.hypot(*(paths - [coord.x, coord.y]).T)
+            if within is True:
+                assert path_distances.max() <= tolerance
+            elif within is False:
+                assert distances.max() > tolerance
+
+    assert results == {True, False, None}
@@ -0,0 +1,55 @@
+import copy
+import numpy as np
+from headless import build_scheduler, null_logger, run_scheduler
+from scheduler import Scheduler
+
+GATHERING = {
+    "algorithm": "Gathering",
+    "num_of_robots": 50,
+    "rigid_movement": True,
+    "visibility_radius": None,
+    "labmda_rate": 10,
+}
+
+
+def _positions(scheduler):
+    return [tuple(robot.coordinates) for robot in scheduler.robots]
+
+
+def test_resume_matches_uninterrupted_run(tmp_path):
+    checkpoint_path = str(tmp_path / "run.ckpt")
+    uninterrupted = build_scheduler(GATHERING, seed=7)
+    run_scheduler(uninterrupted, max_events=500)
+    uninterrupted.write_checkpoint(checkpoint_path)
+
+    resumed = Scheduler.from_checkpoint(checkpoint_path, null_logger())
+    for _ in range(2000):
+        expected = uninterrupted.handle_event()
+        assert resumed.handle_event() == expected
+        assert _positions(resumed) == _positions(uninterrupted)
+        if expected < 0:
+            break
+
+    assert resumed.current_time == uninterrupted.current_time
+
+
+def test_sync_sec_resume_matches_uninterrupted_run():
+    config = {
+        "algorithm": "SEC",
+        "scheduler_type": "SSync",
+        "num_of_robots": 40,
+        "visibility_radius": 60.0,
+        "rigid_movement": False,
+    }
+    uninterrupted = build_scheduler(config, seed=11)
+    run_scheduler(uninterrupted, max_events=5)
+    state = copy.deepcopy(uninterrupted.get_state())
+
+    resumed = build_scheduler(config, seed=11)
+    resumed.set_state(state)
+    for _ in range(50):
+        expected = uninterrupted.handle_event()
+        assert resumed.handle_event() == expected
+        assert np.array_equal(resumed.positions, uninterrupted.positions)
+        if expected < 0:
+            break
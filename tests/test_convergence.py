@@ -0,0 +1,84 @@
+import math
+import numpy as np
+from convergence import ConvergenceDetector
+from enums import Algorithm, RobotState
+from world_state import MOVE_CODE, STATE_CODES, WorldState
+
+THRESHOLD_PRECISION = 3
+
+
+def _detector(positions, algorithm):
+    speeds = [1.0] * len(positions)
+    world = WorldState(np.array(positions), speeds, THRESHOLD_PRECISION)
+    return world, ConvergenceDetector(world, algorithm, THRESHOLD_PRECISION)
+
+
+def _move(world, detector, id, target):
+    world.states[id] = MOVE_CODE
+    world.start_positions[id] = world.positions[id]
+    world.targets[id] = target
+    detector.update(id)
+
+
+def _rest(world, detector, id, position, frozen=False):
+    world.states[id] = STATE_CODES[RobotState.WAIT]
+    world.positions[id] = position
+    world.frozen[id] = frozen
+    detector.update(id)
+
+
+def test_settled_once_every_robot_looked_frozen_since_the_last_move():
+    world, detector = _detector([[0, 0], [10, 0], [0, 10]], Algorithm.GATHERING)
+    for id in range(3):
+        assert detector.check() is None
+        world.frozen[id] = True
+        detector.update(id)
+        detector.looked(id)
+    assert detector.check() == "settled"
+
+    detector.moved()
+    assert detector.check() is None
+
+
+def test_terminated_robots_end_the_run_without_a_reason():
+    world, detector = _detector([[0, 0], [10, 0]], Algorithm.GATHERING)
+    world.frozen[0] = world.terminated[0] = True
+    detector.update(0)
+    detector.looked(0)
+    world.frozen[1] = True
+    detector.update(1)
+    detector.looked(1)
+    assert detector.check() == "settled"
+
+    world.terminated[1] = True
+    detector.update(1)
+    assert detector.check() is None
+
+
+def test_gathered_when_every_robot_is_within_the_threshold():
+    positions = [[5, 5], [5.0004, 5], [5, 5.0004]]
+    world, detector = _detector(positions, Algorithm.GATHERING)
+    assert detector.check() == "gathered"
+
+    # A robot in flight counts with its whole path
+    _move(world, detector, 1, [5.0004, 9])
+    assert detector.check() is None
+    _rest(world, detector, 1, [5.0004, 5.0004])
+    assert detector.check() == "gathered"
+
+
+def test_formed_once_every_robot_at_rest_is_on_the_sec():
+    square = [[1, 0], [0, 1], [-1, 0], [0, -1]]
+    world, detector = _detector(square + [[0.5, 0]], Algorithm.SEC)
+    assert detector.check() is None
+    assert math.isclose(detector.sec_radius(), 1)
+
+    _move(world, detector, 4, [math.sqrt(0.5), math.sqrt(0.5)])
+    assert detector.check() is None
+    _rest(world, detector, 4, [math.sqrt(0.5), math.sqrt(0.5)])
+    assert detector.check() == "formed"
+
+    # Landing outside the circle replaces it
+    _rest(world, detector, 0, [3, 0])
+    assert detector.check() is None
+    assert math.isclose(detector.sec_radius(), 2)
@@ -0,0 +1,70 @@
+import pytest
+from enums import RobotState
+from event_queue import EventQueue
+from type_defs import Event
+
+
+def _drain(queue):
+    events = []
+    while queue:
+        events.append(queue.pop())
+    return events
+
+
+def test_pops_in_time_then_id_order():
+    queue = EventQueue(
+        [Event(2.0, 0, RobotState.LOOK), Event(1.0, 3, RobotState.MOVE)]
+    )
+    queue.push(Event(1.0, 1, RobotState.WAIT))
+    queue.push(Event(0.5, 2, RobotState.LOOK))
+
+    assert [(event.time, event.id) for event in queue.events()] == [
+        (0.5, 2),
+        (1.0, 1),
+        (1.0, 3),
+        (2.0, 0),
+    ]
+    assert [(event.time, event.id) for event in _drain(queue)] == [
+        (0.5, 2),
+        (1.0, 1),
+        (1.0, 3),
+        (2.0, 0),
+    ]
+    with pytest.raises(IndexError):
+        queue.pop()
+
+
+def test_cancel_and_reschedule():
+    queue = EventQueue([Event(float(id), id, RobotState.LOOK) for id in range(4)])
+
+    assert queue.cancel(1) == Event(1.0, 1, RobotState.LOOK)
+    assert queue.cancel(1) is None
+    assert queue.pending(1) is None
+    assert queue.reschedule(0, 5.0) == Event(5.0, 0, RobotState.LOOK)
+    # Pushing replaces the robot's pending event
+    queue.push(Event(0.5, 3, RobotState.MOVE))
+
+    assert len(queue) == 3
+    assert queue.peek() == Event(0.5, 3, RobotState.MOVE)
+    assert _drain(queue) == [
+        Event(0.5, 3, RobotState.MOVE),
+        Event(2.0, 2, RobotState.LOOK),
+        Event(5.0, 0, RobotState.LOOK),
+    ]
+    with pytest.raises(KeyError):
+        queue.reschedule(0, 1.0)
+
+
+def test_observers_go_first_on_equal_times():
+    queue = EventQueue([Event(1.0, 0, RobotState.LOOK)])
+    queue.push_observer("frames", 1.0)
+    queue.push_observer("metrics", 1.0)
+
+    assert queue.next_is_observer()
+    assert queue.peek_observer() == (1.0, "frames")
+    queue.cancel_observer("frames")
+    assert queue.peek_observer() == (1.0, "metrics")
+    queue.push_observer("metrics", 1.5)
+
+    assert not queue.next_is_observer()
+    assert queue.observer_times() == {"metrics": 1.5}
@@ -0,0 +1,58 @@
+import numpy as np
+from headless import build_scheduler
+from snapshot import detect_multiplicity
+
+
+def _brute_force(positions, threshold_precision):
+    threshold = 10**-threshold_precision
+    sizes = [0] * len(positions)
+    grouped = np.zeros(len(positions), dtype=bool)
+    for i in np.lexsort((positions[:, 1], positions[:, 0])):
+        if grouped[i]:
+            continue
+        distance = np.linalg.norm(positions - positions[i], axis=1)
+        group = ~grouped & (distance <= threshold)
+        grouped |= group
+        for j in np.flatnonzero(group):
+            sizes[j] = int(group.sum())
+    return sizes
+
+
+def test_empty():
+    assert detect_multiplicity(np.empty((0, 2)), 5) == []
+
+
+def test_chain_is_split_at_the_threshold():
+    positions = np.array([[0.0, 0.05], [0.09, 0.05], [0.18, 0.05]])
+    assert detect_multiplicity(positions, 1) == [2, 2, 1]
+
+
+def test_same_cell_points_beyond_threshold_are_distinct():
+    positions = np.array([[0.0, 0.0], [0.09, 0.09]])
+    assert detect_multiplicity(positions, 1) == [1, 1]
+
+
+def test_points_straddling_a_cell_boundary_are_grouped():
+    positions = np.array([[0.0999, 0.05], [0.1001, 0.05], [0.5, 0.5]])
+    assert detect_multiplicity(positions, 1) == [2, 2, 1]
+
+
+def test_matches_brute_force():
+    generator = np.random.default_rng(0)
+    for _ in range(500):
+        n = generator.integers(1, 40)
+        decimals = generator.integers(1, 4)
+        positions = np.round(generator.uniform(0, 0.5, (n, 2)), decimals)
+        threshold_precision = int(generator.integers(1, 3))
+        assert detect_multiplicity(positions, threshold_precision) == _brute_force(
+            positions, threshold_precision
+        )
+
+
+def test_snapshots_only_detect_multiplicity_when_enabled():
+    config = {"algorithm": "Gathering", "initial_positions": [[0, 0], [0, 0], [5, 5]]}
+    for enabled, expected in ((False, [1, 1, 1]), (True, [2, 2, 1])):
+        scheduler = build_scheduler({**config, "multiplicity_detection": enabled})
+        snapshot = scheduler.get_snapshot(0.0).visible_from((0, 0), None)
+        assert [details.multiplicity for details in snapshot.values()] == expected
+        scheduler.close()
@@ -0,0 +1,99 @@
+import copy
+import numpy as np
+import pytest
+from headless import build_scheduler
+
+GATHERING = {
+    "algorithm": "Gathering",
+    "num_of_robots": 20,
+    "rigid_movement": True,
+    "visibility_radius": None,
+    "labmda_rate": 10,
+}
+
+
+def _run(scheduler, robot_events, on_event=None):
+    """Robot events as (exit code, time, positions), skipping observer samples"""
+    events = []
+    while len(events) < robot_events:
+        exit_code = scheduler.handle_event()
+        if exit_code < 0:
+            break
+        if exit_code > 0:
+            positions = scheduler.world.positions.copy()
+            events.append((exit_code, scheduler.current_time, positions))
+            if on_event is not None:
+                on_event(len(events))
+    return events
+
+
+def _assert_same_events(events, expected):
+    assert len(events) == len(expected)
+    for event, expected_event in zip(events, expected):
+        assert event[:2] == expected_event[:2]
+        assert np.array_equal(event[2], expected_event[2])
+
+
+def test_observers_do_not_change_robot_events():
+    expected = _run(build_scheduler(GATHERING, seed=3), 400)
+
+    observed = build_scheduler(GATHERING, seed=3)
+    samples = []
+
+    def change_observers(index):
+        if index == 50:
+            observed.attach_observer("sampler", 0.5, samples.append)
+        elif index == 150:
+            observed.set_observer_rate("sampler", 0.2)
+        elif index == 250:
+            observed.detach_observer("sampler")
+
+    _assert_same_events(_run(observed, 400, change_observers), expected)
+    assert samples
+    assert "sampler" not in observed.observers
+
+
+def test_sample_times_follow_attach_and_rate_changes():
+    scheduler = build_scheduler(GATHERING, seed=5)
+    _run(scheduler, 50)
+    start = scheduler.current_time
+    samples = []
+    scheduler.attach_observer("sampler", 0.5, samples.append)
+
+    _run(scheduler, 100)
+    assert samples[0] == start
+    assert np.allclose(np.diff(samples), 0.5)
+
+    changed_at = scheduler.current_time
+    last_sample = samples[-1]
+    count = len(samples)
+    scheduler.set_observer_rate("sampler", 0.2)
+    _run(scheduler, 100)
+    # The next sample is the new rate after the last one, but never in the past
+    assert samples[count] == pytest.approx(max(last_sample + 0.2, changed_at))
+    assert np.allclose(np.diff(samples[count:]), 0.2)
+
+    scheduler.detach_observer("sampler")
+    count = len(samples)
+    _run(scheduler, 100)
+    assert len(samples) == count
+
+
+def test_set_state_drops_finished_observer_whatever_its_name():
+    config = {**GATHERING, "num_of_robots": 3}
+    scheduler = build_scheduler(config, seed=2)
+    samples = []
+    scheduler.attach_observer("sampler", 0.5, samples.append)
+    scheduler.stop("test")
+    assert scheduler.handle_event() == 0
+    assert "sampler" not in scheduler.observers
+    state = copy.deepcopy(scheduler.get_state())
+    assert state["observers"] == {"sampler": None}
+
+    restored = build_scheduler(config, seed=2)
+    restored.attach_observer("sampler", 0.5, samples.append)
+    restored.attach_observer("late", 0.5, samples.append)
+    restored.set_state(state)
+    assert "sampler" not in restored.observers
+    assert "late" in restored.observers
+    assert restored.get_state()["observers"]["sampler"] is None
@@ -0,0 +1,60 @@
+from headless import build_scheduler, run_scheduler
+from profiler import PHASES
+
+CONFIG = {
+    "algorithm": "Gathering",
+    "num_of_robots": 20,
+    "visibility_radius": 80.0,
+    "multiplicity_detection": True,
+    "labmda_rate": 10,
+    "sampling_rate": 0.2,
+    "profile": True,
+}
+
+
+def _profile(events=500):
+    scheduler = build_scheduler(CONFIG, seed=1, visualization=True)
+    metrics = run_scheduler(scheduler, max_events=events)
+    return metrics, metrics["profile"]
+
+
+def test_report_has_documented_phases_and_event_counts():
+    metrics, report = _profile()
+
+    assert set(report["phases"]) <= set(PHASES)
+    for phase in [
+        "queue_pop",
+        "queue_push",
+        "snapshot",
+        "multiplicity",
+        "visibility",
+        "compute",
+        "move",
+        "wait",
+        "observers",
+        "other",
+    ]:
+        assert report["phases"][phase]["calls"] > 0
+
+    counts = {
+        event_type: entry["count"] for event_type, entry in report["events"].items()
+    }
+    assert counts["LOOK"] == metrics["look_events"]
+    assert counts["MOVE"] == metrics["move_events"]
+    assert counts["WAIT"] == metrics["wait_events"]
+    assert sum(counts.values()) == metrics["events"]
+    assert report["phases"]["other"]["calls"] == metrics["events"]
+
+
+def test_nested_phases_are_not_counted_twice():
+    metrics, report = _profile()
+    phases = report["phases"]
+
+    # "other" is clamped at zero, so check the unclamped difference too
+    timed = sum(entry["time"] for name, entry in phases.items() if name != "other")
+    assert timed <= report["total_time"]
+    assert phases["other"]["time"] >= 0.0
+    assert timed + phases["other"]["time"] <= metrics["wall_time"]
+    assert report["total_time"] == sum(
+        entry["time"] for entry in report["events"].values()
+    )
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from enums import RandomMode
+from random_stream import RandomStream
+
+SEED = 11
+BLOCK_SIZE = 16
+
+
+def _stream(mode):
+    generator = np.random.default_rng(SEED)
+    return RandomStream(generator, SEED, mode, block_size=BLOCK_SIZE)
+
+
+def _draw(stream, count):
+    """A mix of every kind of variate, as a run draws them"""
+    values = []
+    for i in range(count):
+        if i % 3 == 0:
+            values.append(stream.uniform())
+        elif i % 3 == 1:
+            values.append(stream.exponential(2.0))
+        else:
+            values.extend(stream.exponentials(0.5, 3).tolist())
+    return values
+
+
+def _save(stream):
+    # A checkpoint keeps the shared generator next to the stream's buffers
+    return stream.generator.bit_generator.state, stream.get_state()
+
+
+def _restore(stream, state):
+    generator_state, stream_state = state
+    stream.generator.bit_generator.state = generator_state
+    stream.set_state(stream_state)
+
+
+@pytest.mark.parametrize("mode", [RandomMode.BUFFERED, RandomMode.COMPAT])
+@pytest.mark.parametrize("k", [0, 1, 7, BLOCK_SIZE, 3 * BLOCK_SIZE + 5])
+def test_restoring_repeats_the_same_variates(mode, k):
+    stream = _stream(mode)
+    _draw(stream, k)
+    state = _save(stream)
+    expected = _draw(stream, 2 * BLOCK_SIZE + 3)
+
+    _restore(stream, state)
+    assert _draw(stream, 2 * BLOCK_SIZE + 3) == expected
+
+    # As when resuming from a checkpoint in a new process
+    resumed = _stream(mode)
+    _restore(resumed, state)
+    assert _draw(resumed, 2 * BLOCK_SIZE + 3) == expected
@@ -0,0 +1,160 @@
+import itertools
+import math
+import numpy as np
+from headless import null_logger
+from robot import Robot
+from sec import circle_support, encloses, smallest_enclosing_circle, still_enclosing
+from snapshot import SnapshotView
+from type_defs import Coordinates
+
+THRESHOLD_PRECISION = 6
+
+
+def _brute_force_radius(points):
+    """Smallest circle through two or three of the points enclosing them all"""
+    candidates = []
+    for a, b in itertools.combinations(points, 2):
+        candidates.append(((a + b) / 2, math.dist(a, b) / 2))
+    for a, b, c in itertools.combinations(points, 3):
+        d = 2 * (a[0] * (b[1] - c[1]) + b[0] * (c[1] - a[1]) + c[0] * (a[1] - b[1]))
+        if abs(d) < 1e-12:
+            continue
+        squares = [p[0] ** 2 + p[1] ** 2 for p in (a, b, c)]
+        center = np.array(
+            [
+                squares[0] * (b[1] - c[1])
+                + squares[1] * (c[1] - a[1])
+                + squares[2] * (a[1] - b[1]),
+                squares[0] * (c[0] - b[0])
+                + squares[1] * (a[0] - c[0])
+                + squares[2] * (b[0] - a[0]),
+            ]
+        ) / d
+        candidates.append((center, math.dist(center, a)))
+
+    return min(
+        radius
+        for center, radius in candidates
+        if np.all(np.linalg.norm(points - center, axis=1) <= radius + 1e-9)
+    )
+
+
+def test_matches_brute_force():
+    generator = np.random.default_rng(4)
+    for n in list(range(2, 12)) * 20:
+        points = generator.uniform(-10, 10, (n, 2))
+        if n % 3 == 0:
+            # Many points on or near a common circle
+            angles = generator.uniform(0, 2 * math.pi, n)
+            points = np.column_stack((np.cos(angles), np.sin(angles))) * 5
+        circle = smallest_enclosing_circle(points, THRESHOLD_PRECISION, generator)
+
+        assert encloses(circle, points, THRESHOLD_PRECISION)
+        assert math.isclose(circle.radius, _brute_force_radius(points), abs_tol=1e-6)
+
+
+def test_degenerate_inputs():
+    single = smallest_enclosing_circle(np.array([[1.0, 2.0]]), THRESHOLD_PRECISION)
+    assert tuple(single.center) == (1.0, 2.0) and single.radius == 0
+
+    collinear = np.array([[0.0, 0.0], [1.0, 1.0], [3.0, 3.0], [2.0, 2.0]])
+    circle = smallest_enclosing_circle(collinear, THRESHOLD_PRECISION)
+    assert math.isclose(circle.radius, math.dist((0, 0), (3, 3)) / 2)
+    np.testing.assert_allclose(circle.center, (1.5, 1.5))
+
+    duplicates = np.array([[2.0, 0.0]] * 5 + [[0.0, 0.0]])
+    circle = smallest_enclosing_circle(duplicates, THRESHOLD_PRECISION)
+    assert math.isclose(circle.radius, 1.0)
+
+
+def _view(ids, positions):
+    n = len(ids)
+    return SnapshotView(
+        0.0,
+        np.asarray(ids),
+        positions,
+        np.zeros(n, dtype=np.int8),
+        np.zeros(n, dtype=bool),
+        np.zeros(n, dtype=bool),
+        THRESHOLD_PRECISION,
+    )
+
+
+def _cached_sec(robot, ids, positions):
+    robot.snapshot = _view(ids, positions)
+    robot.sec = robot._sec_cached(list(ids))
+    return robot.sec
+
+
+def _assert_same_circle(circle, points):
+    fresh = smallest_enclosing_circle(points, THRESHOLD_PRECISION)
+    assert math.isclose(circle.radius, fresh.radius, abs_tol=1e-9)
+    np.testing.assert_allclose(circle.center, fresh.center, atol=1e-9)
+
+
+def _setup(seed):
+    generator = np.random.default_rng(seed)
+    positions = generator.uniform(-10, 10, (15, 2))
+    ids = np.arange(len(positions))
+    robot = Robot(
+        null_logger(),
+        0,
+        Coordinates(*positions[0]),
+        "SEC",
+        threshold_precision=THRESHOLD_PRECISION,
+        generator=generator,
+    )
+    circle = _cached_sec(robot, ids, positions)
+    support = list(robot.sec_support)
+    assert support
+    return robot, ids, positions, circle, support
+
+
+def test_cached_sec_is_reused_while_non_support_robots_move_inside():
+    for seed in range(10):
+        robot, ids, positions, circle, support = _setup(seed)
+        inside = np.setdiff1d(ids, support)
+        moved = positions.copy()
+        moved[inside] = (moved[inside] + circle.center) / 2
+
+        assert still_enclosing(
+            circle, robot.sec_support, ids, moved, THRESHOLD_PRECISION
+        )
+        assert _cached_sec(robot, ids, moved) is circle
+        _assert_same_circle(circle, moved)
+
+
+def test_moving_a_support_robot_solves_again():
+    for seed in range(10):
+        robot, ids, positions, circle, support = _setup(seed)
+        moved = positions.copy()
+        moved[support[0]] = (moved[support[0]] + circle.center) / 2
+
+        assert not still_enclosing(
+            circle, robot.sec_support, ids, moved, THRESHOLD_PRECISION
+        )
+        resolved = _cached_sec(robot, ids, moved)
+        assert resolved is not circle
+        _assert_same_circle(resolved, moved)
+        assert robot.sec_support == circle_support(
+            resolved, ids, moved, THRESHOLD_PRECISION
+        )
+
+
+def test_robot_leaving_the_circle_solves_again():
+    for seed in range(10):
+        robot, ids, positions, circle, support = _setup(seed)
+        outside = np.setdiff1d(ids, support)[0]
+        moved = positions.copy()
+        moved[outside] = np.array(circle.center) + (circle.radius + 1.0, 0.0)
+
+        resolved = _cached_sec(robot, ids, moved)
+        assert resolved is not circle
+        _assert_same_circle(resolved, moved)
+
+        # A support robot leaving the view also invalidates the circle
+        robot, ids, positions, circle, support = _setup(seed)
+        visible = np.setdiff1d(ids, support[:1])
+        resolved = _cached_sec(robot, visible, positions[visible])
+        assert resolved is not circle
+        _assert_same_circle(resolved, positions[visible])
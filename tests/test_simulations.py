@@ -0,0 +1,46 @@
+import threading
+from simulations import Simulation, SimulationManager
+
+
+def test_failing_run_is_reported_to_its_room():
+    emitted = []
+    reported = threading.Event()
+
+    def on_error(simulation: Simulation, error: Exception):
+        emitted.append(("simulation_error", simulation.room, str(error)))
+        emitted.append(("simulation_end", simulation.room))
+        reported.set()
+
+    def run(simulation: Simulation):
+        raise RuntimeError("no robots")
+
+    manager = SimulationManager(max_workers=1, on_error=on_error)
+    simulation = manager.start("room", run)
+    assert reported.wait(timeout=5)
+    manager.shutdown()
+
+    assert emitted == [
+        ("simulation_error", "room", "no robots"),
+        ("simulation_end", "room"),
+    ]
+    assert simulation.future.exception() is None
+    assert manager.get("room") is None
+
+
+def test_starting_a_run_cancels_the_one_in_the_same_room():
+    started = threading.Event()
+
+    def wait_for_cancel(simulation: Simulation):
+        started.set()
+        simulation.cancelled.wait(timeout=5)
+
+    manager = SimulationManager(max_workers=2)
+    first = manager.start("room", wait_for_cancel)
+    assert started.wait(timeout=5)
+    other = manager.start("other room", lambda simulation: None)
+    second = manager.start("room", lambda simulation: None)
+    manager.shutdown()
+
+    assert first.cancelled.is_set()
+    assert not other.cancelled.is_set()
+    assert second.id > first.id
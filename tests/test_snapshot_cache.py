@@ -0,0 +1,60 @@
+import numpy as np
+from headless import build_scheduler
+from snapshot import detect_multiplicity
+from world_state import MOVE_CODE, interpolate
+
+THRESHOLD_PRECISION = 2
+# Pairs of robots on the same spot, so some multiplicities are above 1
+POSITIONS = [[x, y] for x, y in np.random.default_rng(7).uniform(-20, 20, (8, 2))] * 2
+CONFIG = {
+    "algorithm": "Gathering",
+    "initial_positions": POSITIONS,
+    "rigid_movement": False,
+    "visibility_radius": 15,
+    "threshold_precision": THRESHOLD_PRECISION,
+    "stop_on_convergence": False,
+}
+
+
+def _fresh_positions(world, time):
+    positions = world.positions.copy()
+    moving = np.flatnonzero(world.states == MOVE_CODE)
+    positions[moving] = interpolate(
+        world.start_positions[moving],
+        world.targets[moving],
+        world.speeds[moving] * (time - world.start_times[moving]),
+        THRESHOLD_PRECISION,
+    )
+    return positions
+
+
+def test_cached_positions_and_multiplicities_follow_every_move():
+    scheduler = build_scheduler(CONFIG, seed=5)
+    world = scheduler.world
+    cache = scheduler.multiplicity_cache
+    subsets = [np.arange(len(world)), np.arange(0, len(world), 3), np.array([1, 9])]
+    started = stopped = 0
+    was_moving = world.states == MOVE_CODE
+    for _ in range(500):
+        if scheduler.handle_event() < 0:
+            break
+        moving = world.states == MOVE_CODE
+        started += int((moving & ~was_moving).sum())
+        stopped += int((was_moving & ~moving).sum())
+        was_moving = moving
+
+        time = scheduler.current_time
+        for t in (time, time + 0.01):
+            expected = _fresh_positions(world, t)
+            assert np.array_equal(world.positions_at(t), expected)
+            key = world.positions_key(t)
+            for ids in subsets:
+                positions = world.positions_at(t, ids)
+                assert np.array_equal(positions, expected[ids])
+                assert cache.detect(
+                    key, ids, positions, THRESHOLD_PRECISION
+                ) == detect_multiplicity(expected[ids], THRESHOLD_PRECISION)
+    scheduler.close()
+
+    assert started > 0 and stopped > 0
+    assert cache.hits > 0
@@ -0,0 +1,33 @@
+import numpy as np
+from headless import build_scheduler, run_scheduler
+from snapshot import read_spilled_snapshots
+
+CONFIG = {
+    "algorithm": "Gathering",
+    "num_of_robots": 15,
+    "visibility_radius": 30,
+    "rigid_movement": False,
+}
+
+
+def test_spilled_snapshots_read_back_like_ring_history(tmp_path):
+    spill_path = str(tmp_path / "history.bin")
+    spilled = build_scheduler(
+        {**CONFIG, "history_policy": "Spill", "history_path": spill_path}, seed=2
+    )
+    ring = build_scheduler(
+        {**CONFIG, "history_policy": "Ring", "history_size": 1000}, seed=2
+    )
+    run_scheduler(spilled, max_events=300)
+    run_scheduler(ring, max_events=300)
+    spilled.close()
+
+    read_back = list(read_spilled_snapshots(spill_path))
+    history = list(ring.snapshot_history)
+    assert len(read_back) == spilled.snapshot_history.count == len(history)
+    assert len(read_back) > 0
+    for (time, view), (expected_time, expected) in zip(read_back, history):
+        assert time == expected_time
+        np.testing.assert_array_equal(view.ids, expected.ids)
+        np.testing.assert_array_equal(view.positions, expected.positions)
+        assert view.materialize() == expected.materialize()
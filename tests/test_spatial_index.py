@@ -0,0 +1,61 @@
+import math
+import numpy as np
+import pytest
+from enums import RobotState
+from spatial_index import SpatialGrid
+
+
+def test_query_is_a_superset_of_the_robots_in_range():
+    generator = np.random.default_rng(1)
+    states = [RobotState.LOOK, RobotState.MOVE, RobotState.WAIT]
+    grid = SpatialGrid(cell_size=7.5)
+    positions = {}
+    resting = set()
+    for _ in range(2000):
+        id = int(generator.integers(100))
+        state = states[generator.integers(len(states))]
+        position = tuple(generator.uniform(-50, 50, 2).tolist())
+        grid.update(id, state, position)
+        positions[id] = position
+        if state == RobotState.MOVE:
+            resting.discard(id)
+        else:
+            resting.add(id)
+
+    assert grid.moving == set(positions) - resting
+    for radius in (0.5, 7.5, 20, 200):
+        for center in generator.uniform(-60, 60, (20, 2)).tolist():
+            found = grid.query(center, radius)
+            assert len(found) == len(set(found))
+            assert set(found) <= resting
+            assert set(found) >= {
+                id
+                for id in resting
+                if math.dist(center, positions[id]) <= radius
+            }
+
+
+def test_cell_size_must_be_positive():
+    with pytest.raises(ValueError):
+        SpatialGrid(cell_size=0)
+
+
+def test_query_cell_covers_every_point_of_the_cell():
+    generator = np.random.default_rng(2)
+    grid = SpatialGrid(cell_size=10)
+    positions = generator.uniform(-60, 60, (300, 2)).tolist()
+    for id, position in enumerate(positions):
+        grid.update(id, RobotState.WAIT, tuple(position))
+
+    offsets = [(0, 0), (0, 9.999), (9.999, 0), (9.999, 9.999)]
+    offsets += generator.uniform(0, 10, (5, 2)).tolist()
+    for radius in (4, 10, 25):
+        for x, y in set(grid.robot_cells.values()):
+            found = set(grid.query_cell((x, y), radius))
+            for dx, dy in offsets:
+                center = (x * 10 + dx, y * 10 + dy)
+                assert found >= {
+                    id
+                    for id, position in enumerate(positions)
+                    if math.dist(center, position) <= radius
+                }
@@ -0,0 +1,208 @@
+import json
+import threading
+import numpy as np
+import pytest
+from enums import FrameDropPolicy, RobotState
+from streaming import FRAME_HEADER, FrameEmitter, FrameEncoder, FrameQueue, FrameStream
+from type_defs import Coordinates, SnapshotDetails
+from world_state import FROZEN_FLAG, STATES, TERMINATED_FLAG
+
+SIMULATION_ID = 7
+
+
+def _snapshots(n=12, frames=40):
+    """Frames where a few robots change position, state or flags each time"""
+    generator = np.random.default_rng(2)
+    snapshot = {
+        id: SnapshotDetails(
+            Coordinates(*generator.uniform(-50, 50, 2).tolist()),
+            RobotState.WAIT,
+            False,
+            False,
+            1,
+        )
+        for id in range(n)
+    }
+    snapshots = [dict(snapshot)]
+    for _ in range(frames - 1):
+        for id in generator.choice(n, size=generator.integers(0, 4), replace=False):
+            details = snapshot[int(id)]
+            snapshot[int(id)] = details._replace(
+                pos=Coordinates(*generator.uniform(-50, 50, 2).tolist()),
+                state=STATES[generator.integers(len(STATES))],
+                frozen=bool(generator.integers(2)),
+                terminated=bool(generator.integers(2)),
+                multiplicity=int(generator.integers(1, 4)),
+            )
+        snapshots.append(dict(snapshot))
+    return snapshots
+
+
+def _as_json(snapshot):
+    return json.loads(json.dumps(snapshot))
+
+
+def _decode_binary(payload):
+    """Same reading as decodeBinaryFrame in static/main.js"""
+    time, simulation_id, n, keyframe = FRAME_HEADER.unpack_from(payload)
+    assert len(payload) == FRAME_HEADER.size + 26 * n
+
+    offset = FRAME_HEADER.size
+    columns = []
+    for dtype, size in (("<f8", 8), ("<f8", 8), ("<u4", 4), ("<u4", 4)):
+        columns.append(np.frombuffer(payload, dtype, n, offset).tolist())
+        offset += size * n
+    x, y, ids, multiplicity = columns
+    states = np.frombuffer(payload, np.uint8, n, offset).tolist()
+    flags = np.frombuffer(payload, np.uint8, n, offset + n).tolist()
+
+    robots = {
+        str(id): [
+            [x[i], y[i]],
+            STATES[states[i]].value,
+            bool(flags[i] & FROZEN_FLAG),
+            bool(flags[i] & TERMINATED_FLAG),
+            multiplicity[i],
+        ]
+        for i, id in enumerate(ids)
+    }
+    return {
+        "simulation_id": simulation_id,
+        "time": time,
+        "keyframe": bool(keyframe),
+        "robots": robots,
+    }
+
+
+def _replay(frames):
+    """Applies every frame on top of the previous ones, as applyFrame does"""
+    robots = {}
+    for frame in frames:
+        if frame["keyframe"]:
+            robots = {}
+        robots.update(frame["robots"])
+        yield frame["time"], dict(robots)
+
+
+def test_header_layout():
+    assert FRAME_HEADER.size == 24
+    header = FRAME_HEADER.pack(1.5, SIMULATION_ID, 3, True)
+    assert np.frombuffer(header, "<f8", 1, 0)[0] == 1.5
+    assert np.frombuffer(header, "<u4", 2, 8).tolist() == [SIMULATION_ID, 3]
+    assert header[16] == 1 and header[17:] == bytes(7)
+
+
+def test_deltas_rebuild_every_frame():
+    snapshots = _snapshots()
+    for binary in (False, True):
+        encoder = FrameEncoder(SIMULATION_ID, binary)
+        payloads = [
+            encoder.encode(time, snapshot) for time, snapshot in enumerate(snapshots)
+        ]
+        if binary:
+            frames = [_decode_binary(payload) for payload in payloads]
+        else:
+            frames = [json.loads(payload) for payload in payloads]
+
+        assert [frame["keyframe"] for frame in frames] == [True] + [False] * (
+            len(snapshots) - 1
+        )
+        assert all(frame["simulation_id"] == SIMULATION_ID for frame in frames)
+        for i, (time, robots) in enumerate(_replay(frames)):
+            snapshot, previous, frame = snapshots[i], ([{}] + snapshots)[i], frames[i]
+            assert time == i
+            assert robots == _as_json(snapshot)
+            # Only the robots that changed are sent
+            changed = {id for id in snapshot if previous.get(id) != snapshot[id]}
+            assert set(frame["robots"]) == {str(id) for id in changed}
+
+
+def _filled(policy, frames=5, maxsize=3):
+    queue = FrameQueue(maxsize, policy)
+    kept = [queue.put(frame) for frame in range(frames)]
+    return queue, kept
+
+
+def _drain(queue):
+    queue.close()
+    return list(iter(queue.get, None))
+
+
+def test_drop_oldest_keeps_the_latest_frames():
+    queue, kept = _filled(FrameDropPolicy.DROP_OLDEST)
+    assert kept == [True, True, True, False, False]
+    assert queue.dropped == 2
+    assert _drain(queue) == [2, 3, 4]
+
+
+def test_drop_newest_keeps_the_first_frames():
+    queue, kept = _filled(FrameDropPolicy.DROP_NEWEST)
+    assert kept == [True, True, True, False, False]
+    assert queue.dropped == 2
+    assert _drain(queue) == [0, 1, 2]
+
+
+def test_block_waits_for_room():
+    queue, kept = _filled(FrameDropPolicy.BLOCK, frames=3)
+    thread = threading.Thread(target=queue.put, args=(3,))
+    thread.start()
+    thread.join(timeout=0.1)
+    assert thread.is_alive()
+
+    assert queue.get() == 0
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+    assert queue.dropped == 0
+    assert _drain(queue) == [1, 2, 3]
+
+
+def test_close_wakes_up_a_blocked_put():
+    queue, _ = _filled(FrameDropPolicy.BLOCK, frames=3)
+    results = []
+    thread = threading.Thread(target=lambda: results.append(queue.put(3)))
+    thread.start()
+    thread.join(timeout=0.1)
+    assert thread.is_alive()
+
+    queue.close()
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+    assert results == [False]
+    assert queue.dropped == 1
+    # Frames queued before closing are still handed out, then None
+    assert [queue.get() for _ in range(4)] == [0, 1, 2, None]
+    assert queue.put(4) is False
+
+
+def test_emitter_sends_every_frame_before_closing():
+    emitted = []
+    stream = FrameStream(SIMULATION_ID, fps=0)
+    emitter = FrameEmitter(emitted.append, stream, 2, FrameDropPolicy.BLOCK)
+    snapshots = _snapshots(frames=10)
+    for time, snapshot in enumerate(snapshots):
+        assert emitter.put(time, snapshot)
+    emitter.close()
+
+    frames = [json.loads(payload) for payload in emitted]
+    assert [time for time, _ in _replay(frames)] == list(range(len(snapshots)))
+    assert emitter.queue.dropped == 0
+
+
+def test_failing_emit_does_not_block_the_simulation():
+    def emit(payload):
+        raise ConnectionError("client gone")
+
+    stream = FrameStream(SIMULATION_ID, fps=0)
+    emitter = FrameEmitter(emit, stream, 1, FrameDropPolicy.BLOCK)
+    snapshots = _snapshots(frames=10)
+    thread = threading.Thread(
+        target=lambda: [emitter.put(time, s) for time, s in enumerate(snapshots)]
+    )
+    thread.start()
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+
+    with pytest.raises(ConnectionError):
+        emitter.close()
+    # Reported once: closing again in a finally block does not raise
+    emitter.close()
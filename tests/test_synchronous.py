@@ -0,0 +1,36 @@
+import math
+import numpy as np
+from headless import build_scheduler
+from sec import encloses, smallest_enclosing_circle
+
+THRESHOLD_PRECISION = 5
+RADIUS = 30.0
+
+
+def test_limited_visibility_sec_is_the_circle_of_the_visible_robots():
+    config = {
+        "algorithm": "SEC",
+        "scheduler_type": "FSync",
+        "num_of_robots": 80,
+        "visibility_radius": RADIUS,
+        "threshold_precision": THRESHOLD_PRECISION,
+    }
+    scheduler = build_scheduler(config, seed=9)
+    for _ in range(15):
+        positions = scheduler.positions.copy()
+        active = np.flatnonzero(~scheduler.terminated)
+        if scheduler.handle_event() < 0:
+            break
+
+        circles = {}
+        for id in active.tolist():
+            distance = np.hypot(*(positions - positions[id]).T)
+            visible = np.flatnonzero(RADIUS > distance)
+            points = positions[visible]
+            circle = scheduler.secs[id]
+            expected = smallest_enclosing_circle(points, THRESHOLD_PRECISION)
+            assert encloses(circle, points, THRESHOLD_PRECISION)
+            assert math.isclose(circle.radius, expected.radius, abs_tol=1e-4)
+
+            # Robots that see the same robots share one circle
+            assert circles.setdefault(visible.tobytes(), circle) is circle
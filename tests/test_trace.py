@@ -0,0 +1,102 @@
+import os
+import numpy as np
+from headless import build_scheduler, run_scheduler
+from trajectory import TraceReader
+
+CONFIG = {
+    "algorithm": "Gathering",
+    "num_of_robots": 20,
+    "rigid_movement": False,
+    "visibility_radius": 40,
+    "stop_on_convergence": False,
+}
+
+
+def test_snapshot_at_matches_the_run(tmp_path):
+    trace_path = str(tmp_path / "run.trace")
+    scheduler = build_scheduler({**CONFIG, "trace_path": trace_path}, seed=3)
+    expected = {}
+    for _ in range(300):
+        if scheduler.handle_event() < 0:
+            break
+        time = scheduler.current_time
+        expected[time] = scheduler.get_snapshot(time).materialize()
+    scheduler.close()
+
+    reader = TraceReader(trace_path)
+    assert reader.num_of_robots == CONFIG["num_of_robots"]
+    assert reader.end_time == scheduler.current_time
+    for time, snapshot in list(expected.items())[::25]:
+        replayed = reader.snapshot_at(time).materialize()
+        assert replayed.keys() == snapshot.keys()
+        for id, details in snapshot.items():
+            np.testing.assert_allclose(replayed[id].pos, details.pos, atol=1e-9)
+            assert replayed[id].state == details.state
+            assert replayed[id].frozen == details.frozen
+            assert replayed[id].terminated == details.terminated
+
+
+def test_resume_from_keyframe_matches_the_run(tmp_path):
+    trace_path = str(tmp_path / "run.trace")
+    traced = build_scheduler({**CONFIG, "trace_path": trace_path}, seed=5)
+    traced.keyframe_interval = 100
+    run_scheduler(traced, max_events=450)
+    traced.close()
+
+    reader = TraceReader(trace_path)
+    assert len(reader.keyframes) == 4
+    keyframe_time = reader.keyframes[-1][0]
+    resumed = build_scheduler(CONFIG, seed=5)
+    resumed.set_state(reader.keyframe_at(reader.end_time))
+    assert resumed.current_time == keyframe_time
+
+    uninterrupted = build_scheduler(CONFIG, seed=5)
+    run_scheduler(uninterrupted, max_events=400)
+    assert uninterrupted.current_time == keyframe_time
+    for _ in range(500):
+        expected = uninterrupted.handle_event()
+        assert resumed.handle_event() == expected
+        assert [tuple(robot.coordinates) for robot in resumed.robots] == [
+            tuple(robot.coordinates) for robot in uninterrupted.robots
+        ]
+
+
+def _trace(path, flush_every=None):
+    scheduler = build_scheduler({**CONFIG, "trace_path": path}, seed=3)
+    for index in range(300):
+        if scheduler.handle_event() < 0:
+            break
+        if flush_every is not None and index % flush_every == 0:
+            scheduler.trace.flush()
+    scheduler.close()
+    return TraceReader(path)
+
+
+def test_chunks_read_back_as_one_run(tmp_path):
+    single = _trace(str(tmp_path / "single.trace"))
+    chunked = _trace(str(tmp_path / "chunked.trace"), flush_every=37)
+    assert len(chunked._chunks) > 1
+
+    assert len(chunked) == len(single)
+    for name in ["time", "id", "x", "target_y"]:
+        np.testing.assert_array_equal(chunked.column(name), single.column(name))
+        np.testing.assert_array_equal(
+            chunked.column(name, 30, 200), single.column(name)[30:200]
+        )
+    # Targets are NaN before the first LOOK, so compare the raw records
+    assert chunked.robot_records(4).tobytes() == single.robot_records(4).tobytes()
+    for time in np.linspace(0, single.end_time, 7):
+        np.testing.assert_array_equal(
+            chunked.snapshot_at(time).positions, single.snapshot_at(time).positions
+        )
+
+
+def test_partially_written_chunk_is_ignored(tmp_path):
+    path = str(tmp_path / "run.trace")
+    reader = _trace(path, flush_every=100)
+    complete = len(reader) - len(reader._chunks[-1]["time"])
+    del reader
+
+    with open(path, "r+b") as trace_file:
+        trace_file.truncate(os.path.getsize(path) - 10)
+    assert len(TraceReader(path)) == complete
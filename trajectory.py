@@ -0,0 +1,335 @@
+from type_defs import *
+from world_state import STATE_CODES, MOVE_CODE, interpolate
+from world_state import FROZEN_FLAG, TERMINATED_FLAG
+from snapshot import SnapshotView
+import numpy as np
+import os
+import pickle
+import struct
+
+# Trace file layout:
+#   header     TRACE_HEADER (magic, version, number of robots, precision)
+#   speeds     float64 per robot
+#   chunks     one per flush of the writer's buffer, each made of
+#     header   CHUNK_HEADER (number of records)
+#     columns  one fixed-width segment per field of TRACE_DTYPE, in order
+# Record i is the i-th entry of every column, counting across chunks. The
+# first n records hold the initial position of every robot at time 0.
+#
+# Keyframes go to a sidecar file (`<trace>.keyframes`), one entry each:
+#   header     KEYFRAME_HEADER (time, index of the next record, state size)
+#   latest     TRACE_DTYPE, the latest record of every robot
+#   state      pickled Scheduler.get_state()
+TRACE_MAGIC = b"LCMTRACE"
+TRACE_VERSION = 2
+TRACE_HEADER = struct.Struct("<8sIIi")  # magic, version, robots, precision
+CHUNK_HEADER = struct.Struct("<q")
+TRACE_DTYPE = np.dtype(
+    [
+        ("time", "<f8"),
+        ("id", "<i4"),
+        ("state", "i1"),
+        ("flags", "u1"),  # FROZEN_FLAG | TERMINATED_FLAG
+        ("x", "<f8"),
+        ("y", "<f8"),
+        ("target_x", "<f8"),
+        ("target_y", "<f8"),
+    ]
+)
+KEYFRAME_HEADER = struct.Struct("<dqq")
+
+
+def keyframe_path(path: str) -> str:
+    return f"{path}.keyframes"
+
+
+class TraceWriter:
+    """
+    Appends one record per robot event to a binary trace file, buffering
+    them and writing each full buffer as a chunk of column segments
+    """
+
+    def __init__(
+        self,
+        path: str,
+        speeds: list[float],
+        threshold_precision: int,
+        buffer_size: int = 4096,
+    ):
+        self._file = open(path, "wb")
+        self._file.write(
+            TRACE_HEADER.pack(
+                TRACE_MAGIC, TRACE_VERSION, len(speeds), threshold_precision
+            )
+        )
+        self._file.write(np.asarray(speeds, dtype="<f8").tobytes())
+        self._buffer = np.zeros(buffer_size, dtype=TRACE_DTYPE)
+        self._size = 0
+        self._written = 0
+        self._latest = np.zeros(len(speeds), dtype=TRACE_DTYPE)
+        self._keyframe_path = keyframe_path(path)
+        self._keyframes = None
+
+    def record(self, time: float, robot) -> None:
+        target = robot.calculated_position
+        if target is None:
+            target = (np.nan, np.nan)
+        flags = FROZEN_FLAG * robot.frozen | TERMINATED_FLAG * robot.terminated
+
+        self._buffer[self._size] = (
+            time,
+            robot.id,
+            STATE_CODES[robot.state],
+            flags,
+            robot.coordinates[0],
+            robot.coordinates[1],
+            target[0],
+            target[1],
+        )
+        self._latest[robot.id] = self._buffer[self._size]
+        self._size += 1
+        if self._size == len(self._buffer):
+            self.flush()
+
+    def keyframe(self, time: float, state: dict) -> None:
+        """Stores the full scheduler state so replay can start from here"""
+        if self._keyframes is None:
+            self._keyframes = open(self._keyframe_path, "wb")
+
+        payload = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+        self._keyframes.write(
+            KEYFRAME_HEADER.pack(time, self._written + self._size, len(payload))
+        )
+        self._keyframes.write(self._latest.tobytes())
+        self._keyframes.write(payload)
+
+    def flush(self) -> None:
+        if self._size:
+            chunk = self._buffer[: self._size]
+            self._file.write(CHUNK_HEADER.pack(self._size))
+            for name in TRACE_DTYPE.names:
+                self._file.write(np.ascontiguousarray(chunk[name]).tobytes())
+        self._file.flush()
+        self._written += self._size
+        self._size = 0
+        if self._keyframes is not None:
+            self._keyframes.flush()
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+        if self._keyframes is not None:
+            self._keyframes.close()
+
+
+class TraceReader:
+    """
+    Memory-mapped view of a trace file. Each column of each chunk is mapped
+    on its own, so reading a column (e.g. `reader.column("time")`) only
+    touches that column's part of the file.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as trace_file:
+            magic, version, n, threshold_precision = TRACE_HEADER.unpack(
+                trace_file.read(TRACE_HEADER.size)
+            )
+        if magic != TRACE_MAGIC:
+            raise ValueError(f"{path} is not a trace file")
+        if version != TRACE_VERSION:
+            raise ValueError(f"Unsupported trace version {version}")
+
+        self.num_of_robots = n
+        self.threshold_precision = threshold_precision
+        self.speeds = np.memmap(
+            path, dtype="<f8", mode="r", offset=TRACE_HEADER.size, shape=(n,)
+        )
+
+        # Per chunk, a memmap of every column; starts[c] is its first record
+        self._chunks: list[dict[str, np.ndarray]] = []
+        self._index_chunks(path, TRACE_HEADER.size + 8 * n)
+        sizes = [len(chunk["time"]) for chunk in self._chunks]
+        self._starts = np.concatenate(([0], np.cumsum(sizes, dtype=np.int64)))
+        self._last_times = np.array([chunk["time"][-1] for chunk in self._chunks])
+
+        # (time, index of the next record, offset of the entry, state size)
+        self.keyframes: list[tuple[float, int, int, int]] = []
+        self._keyframe_path = keyframe_path(path)
+        if os.path.exists(self._keyframe_path):
+            self._index_keyframes()
+        self._keyframe_times = np.array([keyframe[0] for keyframe in self.keyframes])
+
+    def _index_chunks(self, path: str, offset: int) -> None:
+        file_size = os.path.getsize(path)
+        with open(path, "rb") as trace_file:
+            while True:
+                trace_file.seek(offset)
+                header = trace_file.read(CHUNK_HEADER.size)
+                if len(header) < CHUNK_HEADER.size:
+                    break
+                (size,) = CHUNK_HEADER.unpack(header)
+                offset += CHUNK_HEADER.size
+                if offset + size * TRACE_DTYPE.itemsize > file_size:
+                    break  # Partially written chunk
+
+                chunk = {}
+                for name in TRACE_DTYPE.names:
+                    dtype = TRACE_DTYPE.fields[name][0]
+                    chunk[name] = np.memmap(
+                        path, dtype=dtype, mode="r", offset=offset, shape=(size,)
+                    )
+                    offset += size * dtype.itemsize
+                self._chunks.append(chunk)
+
+    def _index_keyframes(self) -> None:
+        latest_size = self.num_of_robots * TRACE_DTYPE.itemsize
+        with open(self._keyframe_path, "rb") as keyframe_file:
+            offset = 0
+            while header := keyframe_file.read(KEYFRAME_HEADER.size):
+                if len(header) < KEYFRAME_HEADER.size:
+                    break  # Partially written entry
+                time, record_index, state_size = KEYFRAME_HEADER.unpack(header)
+                if record_index > len(self):
+                    break  # Records after this keyframe were never flushed
+                self.keyframes.append((time, record_index, offset, state_size))
+                offset += KEYFRAME_HEADER.size + latest_size + state_size
+                keyframe_file.seek(offset)
+
+    def __len__(self) -> int:
+        return int(self._starts[-1])
+
+    @property
+    def end_time(self) -> float:
+        return float(self._last_times[-1]) if len(self._chunks) else 0.0
+
+    def column(
+        self, name: str, start: int = 0, end: int | None = None
+    ) -> np.ndarray:
+        """Field `name` of records start to end, only copied if it spans chunks"""
+        end = len(self) if end is None else min(end, len(self))
+        first = np.searchsorted(self._starts, start, side="right") - 1
+        last = np.searchsorted(self._starts, end, side="left")
+        segments = [
+            self._chunks[c][name][
+                max(start - self._starts[c], 0) : end - self._starts[c]
+            ]
+            for c in range(max(first, 0), min(last, len(self._chunks)))
+        ]
+        if len(segments) == 1:
+            return segments[0]
+        if not segments:
+            return np.empty(0, dtype=TRACE_DTYPE[name])
+        return np.concatenate(segments)
+
+    def records(self, start: int = 0, end: int | None = None) -> np.ndarray:
+        """Records start to end as TRACE_DTYPE rows, gathered from the columns"""
+        ids = self.column("id", start, end)
+        records = np.empty(len(ids), dtype=TRACE_DTYPE)
+        for name in TRACE_DTYPE.names:
+            records[name] = self.column(name, start, end)
+        return records
+
+    def robot_records(self, id: Id) -> np.ndarray:
+        """Every record of a single robot, in time order"""
+        rows = np.flatnonzero(self.column("id") == id)
+        return self._take(rows)
+
+    def _take(self, rows: np.ndarray) -> np.ndarray:
+        """Records at indices `rows`, reading only those rows"""
+        records = np.empty(len(rows), dtype=TRACE_DTYPE)
+        chunks = np.searchsorted(self._starts, rows, side="right") - 1
+        for c in np.unique(chunks):
+            selected = chunks == c
+            local = rows[selected] - self._starts[c]
+            for name in TRACE_DTYPE.names:
+                records[name][selected] = self._chunks[c][name][local]
+        return records
+
+    def _end_index(self, time: float) -> int:
+        """Number of records at or before `time`"""
+        c = np.searchsorted(self._last_times, time, side="right")
+        if c == len(self._chunks):
+            return len(self)
+        times = self._chunks[c]["time"]
+        return int(self._starts[c] + np.searchsorted(times, time, side="right"))
+
+    def _keyframe_before(self, time: float) -> tuple[float, int, int, int] | None:
+        """Latest keyframe taken at or before `time`"""
+        i = np.searchsorted(self._keyframe_times, time, side="right")
+        return self.keyframes[i - 1] if i > 0 else None
+
+    def keyframe_at(self, time: float) -> dict | None:
+        """
+        Scheduler state of the latest keyframe at or before `time`, to be
+        passed to `Scheduler.set_state`. None if there is no such keyframe.
+        """
+        keyframe = self._keyframe_before(time)
+        if keyframe is None:
+            return None
+
+        _, _, offset, state_size = keyframe
+        latest_size = self.num_of_robots * TRACE_DTYPE.itemsize
+        with open(self._keyframe_path, "rb") as keyframe_file:
+            keyframe_file.seek(offset + KEYFRAME_HEADER.size + latest_size)
+            return pickle.loads(keyframe_file.read(state_size))
+
+    def _latest_records(self, time: float) -> np.ndarray:
+        """Latest record of every robot up to `time`"""
+        latest = np.zeros(self.num_of_robots, dtype=TRACE_DTYPE)
+        start = 0
+
+        # Start from the closest keyframe instead of the first record
+        keyframe = self._keyframe_before(time)
+        if keyframe is not None:
+            _, start, offset, _ = keyframe
+            latest[:] = np.fromfile(
+                self._keyframe_path,
+                dtype=TRACE_DTYPE,
+                count=self.num_of_robots,
+                offset=offset + KEYFRAME_HEADER.size,
+            )
+
+        end = self._end_index(time)
+        ids = self.column("id", start, end)
+
+        # Last occurrence of every id: first occurrence in the reversed slice
+        unique_ids, reversed_index = np.unique(ids[::-1], return_index=True)
+        latest[unique_ids] = self._take(start + len(ids) - 1 - reversed_index)
+
+        return latest
+
+    def snapshot_at(self, time: float) -> SnapshotView:
+        """Reconstructs the positions and states of all robots at `time`"""
+        return self._snapshot(
+            time, np.arange(self.num_of_robots), self._latest_records(time)
+        )
+
+    def _snapshot(
+        self, time: float, ids: np.ndarray, latest: np.ndarray
+    ) -> SnapshotView:
+        positions = np.column_stack((latest["x"], latest["y"]))
+        states = latest["state"].astype(np.int8)
+
+        # Robots in MOVE are interpolated from where they started moving
+        moving = np.flatnonzero(states == MOVE_CODE)
+        if len(moving):
+            positions[moving] = interpolate(
+                positions[moving],
+                np.column_stack(
+                    (latest["target_x"][moving], latest["target_y"][moving])
+                ),
+                self.speeds[ids[moving]] * (time - latest["time"][moving]),
+                self.threshold_precision,
+            )
+
+        return SnapshotView(
+            time,
+            ids.astype(np.intp),
+            positions,
+            states,
+            (latest["flags"] & FROZEN_FLAG).astype(bool),
+            (latest["flags"] & TERMINATED_FLAG).astype(bool),
+            self.threshold_precision,
+        )
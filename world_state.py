@@ -0,0 +1,146 @@
+from enums import RobotState
+import numpy as np
+
+STATES = list(RobotState)
+STATE_CODES = {state: code for code, state in enumerate(STATES)}
+MOVE_CODE = STATE_CODES[RobotState.MOVE]
+# Frozen and terminated packed into one byte, in traces and streamed frames
+FROZEN_FLAG = 1
+TERMINATED_FLAG = 2
+
+
+class WorldState:
+    """
+    Array-backed copy of every robot's mutable fields. Row i holds robot i.
+    Rows are refreshed by the Scheduler after each robot event, so reading
+    the whole world at a given time never has to touch the Robot objects.
+
+    `version` is bumped whenever a robot starts or stops moving or its
+    position changes. While it is unchanged, the positions of the whole
+    world are only recomputed for the robots in flight, and not at all when
+    no robot is moving.
+    """
+
+    def __init__(
+        self,
+        positions: np.ndarray,
+        speeds: list[float],
+        threshold_precision: int,
+    ):
+        n = len(positions)
+        self.threshold_precision = threshold_precision
+        self.positions = np.array(positions, dtype=np.float64).reshape(n, 2)
+        self.start_positions = self.positions.copy()
+        self.targets = np.full((n, 2), np.nan)
+        self.start_times = np.full(n, np.nan)
+        self.speeds = np.array(speeds, dtype=np.float64)
+        self.states = np.full(n, STATE_CODES[RobotState.WAIT], dtype=np.int8)
+        self.frozen = np.zeros(n, dtype=bool)
+        self.terminated = np.zeros(n, dtype=bool)
+        self.version = 0
+        self._moving: tuple[int, np.ndarray] | None = None  # version, ids
+        # (version, time or None when nothing moves), read-only positions
+        self._positions: tuple[tuple[int, float | None], np.ndarray] | None = None
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def update(self, robot) -> None:
+        """Copies the mutable fields of a single robot into its row"""
+        i = robot.id
+        state = STATE_CODES[robot.state]
+        if (
+            state == MOVE_CODE
+            or self.states[i] == MOVE_CODE
+            or self.positions[i].tolist() != list(robot.coordinates)
+        ):
+            self.version += 1
+
+        self.positions[i] = robot.coordinates
+        self.start_positions[i] = robot.start_position
+        if robot.calculated_position is not None:
+            self.targets[i] = robot.calculated_position
+        self.start_times[i] = (
+            robot.start_time if robot.start_time is not None else np.nan
+        )
+        self.states[i] = state
+        self.frozen[i] = robot.frozen
+        self.terminated[i] = robot.terminated
+
+    def moving(self) -> np.ndarray:
+        """Ids of the robots currently in the MOVE state"""
+        if self._moving is None or self._moving[0] != self.version:
+            self._moving = (self.version, np.flatnonzero(self.states == MOVE_CODE))
+        return self._moving[1]
+
+    def positions_key(self, time: float) -> tuple[int, float | None]:
+        """
+        Identifies the positions of the world at `time`: the same key means
+        the same positions
+        """
+        return (self.version, time if len(self.moving()) else None)
+
+    def positions_at(self, time: float, ids: np.ndarray | None = None) -> np.ndarray:
+        """
+        Positions of all robots, or only of `ids`, at the given time. Robots
+        in MOVE are interpolated along their path in one pass, the same way
+        as `Robot.get_position`. The positions of the whole world are cached
+        and returned read-only until `version` or, while a robot is moving,
+        `time` changes; `ids` are sliced from them while they are valid.
+        Otherwise only the moving robots among `ids` are interpolated.
+        """
+        key = self.positions_key(time)
+        if ids is None:
+            if self._positions is None or self._positions[0] != key:
+                moving = self.moving()
+                positions = self.positions.copy()
+                if len(moving):
+                    positions[moving] = self._interpolate(moving, time)
+                positions.flags.writeable = False
+                self._positions = (key, positions)
+
+            return self._positions[1]
+
+        if self._positions is not None and self._positions[0] == key:
+            return self._positions[1][ids]
+        if key[1] is None:
+            # Nothing is moving
+            return self.positions[ids]
+
+        positions = self.positions[ids]
+        moving = np.flatnonzero(self.states[ids] == MOVE_CODE)
+        if len(moving):
+            positions[moving] = self._interpolate(ids[moving], time)
+
+        return positions
+
+    def _interpolate(self, rows: np.ndarray, time: float) -> np.ndarray:
+        """Positions at `time` of the moving robots in `rows`"""
+        return interpolate(
+            self.start_positions[rows],
+            self.targets[rows],
+            self.speeds[rows] * (time - self.start_times[rows]),
+            self.threshold_precision,
+        )
+
+
+def interpolate(
+    start: np.ndarray,
+    end: np.ndarray,
+    distance_covered: np.ndarray,
+    threshold_precision: int,
+) -> np.ndarray:
+    """
+    Positions after covering `distance_covered` along each start -> end
+    segment, snapping to the end when within the threshold
+    """
+    delta = end - start
+    distance = np.hypot(delta[:, 0], delta[:, 1])
+
+    arrived = (distance_covered > distance) | (
+        np.abs(distance_covered - distance) < 10**-threshold_precision
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        factor = distance_covered / distance
+
+    return np.where(arrived[:, None], end, start + factor[:, None] * delta)